@@ -33,3 +33,81 @@ JUDGE_MODEL = "o3"
 WRITER_LABEL = "The Writer"
 WRITER_MODEL = "o3"
 MAX_DEBATE_ROUNDS = 3
+# Draft the final answer from the leading debater while the judge runs (opt-in).
+SPECULATIVE_WRITER = os.getenv("SPECULATIVE_WRITER", "false").lower() in {"1", "true", "yes"}
+
+# "delta" sends round 1 in full plus later-round changes; "full" sends every round verbatim.
+JUDGE_INPUT_MODE = os.getenv("JUDGE_INPUT_MODE", "delta")
+JUDGE_INPUT_TOKEN_BUDGET = int(os.getenv("JUDGE_INPUT_TOKEN_BUDGET", "6000"))
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "queue/jobs.sqlite3")
+# WAL lets readers run alongside a writer but needs shared memory on one machine; leave it off when workers on
+# several hosts share the queue file over a network filesystem.
+JOB_QUEUE_WAL = os.getenv("JOB_QUEUE_WAL", "false").lower() in {"1", "true", "yes"}
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+
+# Tiered routing: easy prompts get a single-model answer, medium a one-round debate, hard the full council.
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() in {"1", "true", "yes"}
+ROUTER_FAST_MODEL = os.getenv("ROUTER_FAST_MODEL", "gpt-4.1")
+# Only a negative score (an easy marker or a match with a converged prompt) skips the debate; prompts with no
+# signals at all get a short debate, and a single analysis term is enough for the full council.
+ROUTER_EASY_MAX_SCORE = int(os.getenv("ROUTER_EASY_MAX_SCORE", "-1"))
+ROUTER_HARD_MIN_SCORE = int(os.getenv("ROUTER_HARD_MIN_SCORE", "2"))
+ROUTER_MEDIUM_ROUNDS = int(os.getenv("ROUTER_MEDIUM_ROUNDS", "1"))
+ROUTER_SIMILARITY_THRESHOLD = float(os.getenv("ROUTER_SIMILARITY_THRESHOLD", "0.6"))
+ROUTER_MEMORY_PATH = os.getenv("ROUTER_MEMORY_PATH", "router_memory.json")
+ROUTER_MEMORY_LIMIT = int(os.getenv("ROUTER_MEMORY_LIMIT", "500"))
+
+# Number of debates the interactive CLI runs at once while accepting new prompts.
+MAX_CONCURRENT_DEBATES = int(os.getenv("MAX_CONCURRENT_DEBATES", "1"))
+
+# Write-ahead log of completed debate stages so interrupted debates can resume.
+CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() in {"1", "true", "yes"}
+CHECKPOINT_DIRECTORY = os.getenv("CHECKPOINT_DIRECTORY", "checkpoints")
+
+# Chrome Trace Event (Perfetto) timelines per debate; off by default.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() in {"1", "true", "yes"}
+TRACE_DIRECTORY = os.getenv("TRACE_DIRECTORY", "traces")
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "conversations/search_index.sqlite3")
+
+# Per-role output budgets. max_tokens maps to max_completion_tokens and caps the visible reply;
+# reasoning_effort is only sent to models matching REASONING_MODEL_PREFIXES.
+ROLE_OUTPUT_BUDGETS = {
+    "debater": {"max_tokens": 1200, "reasoning_effort": "low"},
+    "consensus": {"max_tokens": 400, "reasoning_effort": "low"},
+    "judge": {"max_tokens": 6000, "reasoning_effort": "medium"},
+    "writer": {"max_tokens": 4000, "reasoning_effort": "low"},
+}
+REASONING_MODEL_PREFIXES = ("o1", "o3", "o4", "gpt-5")
+# On reasoning models max_completion_tokens also counts hidden reasoning tokens, so their cap gets this
+# much extra headroom on top of the role budget. It is not scaled down near the latency target.
+REASONING_TOKEN_ALLOWANCE = int(os.getenv("REASONING_TOKEN_ALLOWANCE", "16000"))
+DEBATER_INITIAL_WORD_LIMIT = 250
+DEBATER_UPDATE_WORD_LIMIT = 200
+CONSENSUS_COMMENT_WORD_LIMIT = 40
+# Budgets start shrinking once a debate has used BUDGET_TIGHTEN_AFTER of its latency target,
+# scaling linearly down to BUDGET_MIN_SCALE at the target.
+DEBATE_LATENCY_TARGET_SECONDS = float(os.getenv("DEBATE_LATENCY_TARGET_SECONDS", "180"))
+BUDGET_TIGHTEN_AFTER = float(os.getenv("BUDGET_TIGHTEN_AFTER", "0.5"))
+BUDGET_MIN_SCALE = float(os.getenv("BUDGET_MIN_SCALE", "0.5"))
+
+# "infer" counts the validated winner and debaters that conceded to it as agreeing without polling them;
+# "poll_all" asks every debater for a consensus vote.
+CONSENSUS_POLICY = os.getenv("CONSENSUS_POLICY", "infer")
+
+# Columnar (Parquet) export of every finished session for analytics; needs the optional pyarrow package.
+ANALYTICS_EXPORT_ENABLED = os.getenv("ANALYTICS_EXPORT_ENABLED", "false").lower() in {"1", "true", "yes"}
+ANALYTICS_DIRECTORY = os.getenv("ANALYTICS_DIRECTORY", "analytics")
+
+# Offline batch mode (worker.py batch). "openai" submits to the provider's Batch API; "local" hands batches to the
+# stand-in server (python3 -m services.batch_client serve), which answers them through the regular chat endpoint.
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "openai")
+BATCH_DIRECTORY = os.getenv("BATCH_DIRECTORY", "batches")
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "50000"))
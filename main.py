@@ -1,4 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import CHECKPOINT_DIRECTORY, MAX_CONCURRENT_DEBATES
 from services.openai_client import Colors
+from storage.checkpoints import list_incomplete_sessions, new_session_id
+from storage.archive import save_conversation_archive
 from storage.files import (
     clear_active_conversation,
     clear_conversations_and_data,
@@ -11,11 +17,107 @@ from storage.files import (
     save_conversations_and_data,
     set_active_conversation,
 )
-from workflow.debate import run_debate_session
+from storage.search_index import print_search_results, search_conversations
+from workflow.budgets import format_output_budget_report
+from workflow.debate import format_speculation_report
+from workflow.router import format_tier_report, run_routed_session
 
 
 CONVERSATION_ID = 0
 CONVERSATION_HISTORY = []
+HISTORY_LOCK = threading.Lock()
+DEBATE_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DEBATES)
+PENDING_TURNS = []
+PENDING_PLACEHOLDER = "[Debate in progress]"
+
+
+# This function lays out the assistant message stored for a finished debate.
+def build_assistant_response(active_system_prompt, user_input, debate_result):
+    system_section = active_system_prompt.strip() if active_system_prompt.strip() else "(none)"
+    verdict_section = debate_result.get("verdict", "").strip() or "[No verdict provided]"
+    final_answer_section = debate_result.get("final_answer", "").strip() or "[No final answer provided]"
+    votes_section = debate_result.get("votes", "").strip() or "[No votes recorded]"
+    transcript_section = debate_result.get("transcript", "").strip() or "[No transcript available]"
+
+    assistant_sections = [
+        "## SYSTEM",
+        system_section,
+        "",
+        "## USER MESSAGE",
+        user_input,
+        "",
+        "## VERDICT",
+        verdict_section,
+        "",
+        "## FINAL ANSWER",
+        final_answer_section,
+        "",
+        "## VOTES",
+        votes_section,
+        "",
+        "## TRANSCRIPT",
+        transcript_section,
+    ]
+    return "\n".join(assistant_sections).strip(), final_answer_section or verdict_section
+
+
+# This function fills in a queued turn once its debate finishes.
+def complete_turn(turn, future):
+    history = turn["history"]
+    try:
+        debate_result = future.result()
+    except Exception as error:
+        print(f"{Colors.RED}Debate error (turn {turn['number']}): {error}{Colors.RESET}")
+        with HISTORY_LOCK:
+            history[:] = [
+                message
+                for message in history
+                if message is not turn["user_message"] and message is not turn["assistant_message"]
+            ]
+            PENDING_TURNS.remove(turn)
+        return
+
+    assistant_response, console_summary = build_assistant_response(
+        turn["system_prompt"], turn["user_input"], debate_result
+    )
+    print(
+        f"{Colors.GREEN}Assistant (turn {turn['number']}):{Colors.RESET}",
+        f"{Colors.GREEN}{console_summary}{Colors.RESET}",
+    )
+    with HISTORY_LOCK:
+        turn["assistant_message"]["content"] = assistant_response
+        PENDING_TURNS.remove(turn)
+        if history is CONVERSATION_HISTORY:
+            set_active_conversation(history)
+
+
+# This function queues a prompt so the debate runs while the prompt stays usable.
+def submit_turn(user_input, active_system_prompt, session_id=None):
+    """Reserve the user/assistant slots in history now and run the debate in the background.
+
+    Passing the session_id of an interrupted debate resumes it from its checkpoint log.
+    """
+    # The id is fixed up front so the `r` shortcut can tell this debate is still running.
+    session_id = session_id or new_session_id()
+    with HISTORY_LOCK:
+        user_message = {"role": "user", "content": user_input}
+        assistant_message = {"role": "assistant", "content": PENDING_PLACEHOLDER}
+        CONVERSATION_HISTORY.append(user_message)
+        CONVERSATION_HISTORY.append(assistant_message)
+        turn = {
+            "number": sum(1 for message in CONVERSATION_HISTORY if message.get("role") == "user"),
+            "history": CONVERSATION_HISTORY,
+            "user_input": user_input,
+            "system_prompt": active_system_prompt,
+            "user_message": user_message,
+            "assistant_message": assistant_message,
+            "session_id": session_id,
+        }
+        PENDING_TURNS.append(turn)
+        pending_count = len(PENDING_TURNS)
+    future = DEBATE_EXECUTOR.submit(run_routed_session, user_input, active_system_prompt, session_id)
+    future.add_done_callback(lambda finished: complete_turn(turn, finished))
+    print(f"{Colors.YELLOW}Queued turn {turn['number']} ({pending_count} pending){Colors.RESET}")
 
 
 if __name__ == "__main__":
@@ -31,76 +133,72 @@ if __name__ == "__main__":
 
         lower_input = user_input.lower()
         if lower_input == "q":
+            if PENDING_TURNS:
+                print(f"{Colors.YELLOW}Waiting for {len(PENDING_TURNS)} pending debate(s)...{Colors.RESET}")
+            DEBATE_EXECUTOR.shutdown(wait=True)
             clear_active_conversation()
             break
         elif lower_input == "s":
-            save_conversation(CONVERSATION_HISTORY, CONVERSATION_ID)
+            with HISTORY_LOCK:
+                save_conversation(CONVERSATION_HISTORY, CONVERSATION_ID)
             continue
         elif lower_input == "d":
-            save_conversation_data(CONVERSATION_HISTORY, CONVERSATION_ID)
+            with HISTORY_LOCK:
+                save_conversation_data(CONVERSATION_HISTORY, CONVERSATION_ID)
             continue
         elif lower_input == "a":
-            save_conversations_and_data(CONVERSATION_HISTORY, CONVERSATION_ID)
+            with HISTORY_LOCK:
+                save_conversations_and_data(CONVERSATION_HISTORY, CONVERSATION_ID)
+            continue
+        elif lower_input == "z":
+            with HISTORY_LOCK:
+                save_conversation_archive(CONVERSATION_HISTORY, CONVERSATION_ID)
             continue
         elif lower_input == "c":
             clear_conversations_and_data()
             continue
+        elif lower_input == "m":
+            print(format_tier_report())
+            print(format_speculation_report())
+            print(format_output_budget_report())
+            continue
+        elif lower_input == "r":
+            with HISTORY_LOCK:
+                running_sessions = {turn["session_id"] for turn in PENDING_TURNS}
+            incomplete_sessions = dict(list_incomplete_sessions(CHECKPOINT_DIRECTORY, exclude=running_sessions))
+            if not incomplete_sessions:
+                print(f"{Colors.YELLOW}No interrupted debates to resume.{Colors.RESET}")
+                continue
+            for session_id, header in incomplete_sessions.items():
+                print(f"{session_id}: {header['user_prompt'][:60]}")
+            session_id = input("Session ID:").strip()
+            header = incomplete_sessions.get(session_id)
+            if header is None:
+                print(f"{Colors.YELLOW}Unknown session {session_id}.{Colors.RESET}")
+                continue
+            submit_turn(header["user_prompt"], header["base_system"], session_id=session_id)
+            continue
+        elif lower_input == "f":
+            search_query = input("Search:").strip()
+            print_search_results(search_conversations(search_query))
+            continue
         elif lower_input == "i":
             user_input = get_user_input_from_file()
         elif lower_input == "h":
             previous_conversation_id = input("History Number:").strip()
             conversation_data = get_conversation_data(previous_conversation_id)
-            CONVERSATION_HISTORY = conversation_data
-            active_system_prompt = ""
-            for message in CONVERSATION_HISTORY:
-                if message.get("role") == "system":
-                    active_system_prompt = message.get("content", "")
-                    break
-            set_active_conversation(CONVERSATION_HISTORY)
+            with HISTORY_LOCK:
+                CONVERSATION_HISTORY = conversation_data
+                active_system_prompt = ""
+                for message in CONVERSATION_HISTORY:
+                    if message.get("role") == "system":
+                        active_system_prompt = message.get("content", "")
+                        break
+                set_active_conversation(CONVERSATION_HISTORY)
             continue
 
         if not user_input:
             print(f"{Colors.YELLOW}No prompt provided. Try again.{Colors.RESET}")
             continue
 
-        try:
-            debate_result = run_debate_session(user_input, active_system_prompt)
-        except Exception as error:
-            print(f"{Colors.RED}Debate error: {error}{Colors.RESET}")
-            continue
-
-        CONVERSATION_HISTORY.append({"role": "user", "content": user_input})
-
-        system_section = active_system_prompt.strip() if active_system_prompt.strip() else "(none)"
-        verdict_section = debate_result.get("verdict", "").strip() or "[No verdict provided]"
-        final_answer_section = debate_result.get("final_answer", "").strip() or "[No final answer provided]"
-        votes_section = debate_result.get("votes", "").strip() or "[No votes recorded]"
-        transcript_section = debate_result.get("transcript", "").strip() or "[No transcript available]"
-
-        assistant_sections = [
-            "## SYSTEM",
-            system_section,
-            "",
-            "## USER MESSAGE",
-            user_input,
-            "",
-            "## VERDICT",
-            verdict_section,
-            "",
-            "## FINAL ANSWER",
-            final_answer_section,
-            "",
-            "## VOTES",
-            votes_section,
-            "",
-            "## TRANSCRIPT",
-            transcript_section,
-        ]
-        assistant_response = "\n".join(assistant_sections).strip()
-
-        console_summary = final_answer_section or verdict_section
-        print(f"{Colors.GREEN}Assistant:{Colors.RESET}", f"{Colors.GREEN}{console_summary}{Colors.RESET}")
-
-        CONVERSATION_HISTORY.append({"role": "assistant", "content": assistant_response})
-
-        set_active_conversation(CONVERSATION_HISTORY)
+        submit_turn(user_input, active_system_prompt)
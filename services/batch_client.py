@@ -0,0 +1,187 @@
+# This file sends chat requests through a batch endpoint and collects their results.
+import argparse
+import json
+import os
+import time
+import uuid
+
+import openai
+
+from config import BATCH_BACKEND, BATCH_COMPLETION_WINDOW, BATCH_DIRECTORY, BATCH_POLL_SECONDS
+from services.openai_client import Colors
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+FINISHED_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+# This function writes requests in the batch input format, one JSON line per request.
+def write_batch_input(requests, file_path):
+    temporary_name = f"{file_path}.tmp"
+    with open(temporary_name, "w", encoding="utf-8") as f:
+        for custom_id, body in requests.items():
+            line = {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    os.replace(temporary_name, file_path)
+
+
+# This function finds the folder the local stand-in server uses for a batch.
+def local_batch_directory(batch_id, directory=BATCH_DIRECTORY):
+    return os.path.join(directory, "local", batch_id)
+
+
+# This function records a local batch's progress the way the provider reports it.
+def write_local_status(batch_directory, status, completed=0, failed=0):
+    file_name = os.path.join(batch_directory, "status.json")
+    with open(f"{file_name}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"status": status, "request_counts": {"completed": completed, "failed": failed}}, f)
+    os.replace(f"{file_name}.tmp", file_name)
+
+
+# This function submits requests as one batch and returns its id.
+def submit_batch(requests, backend=BATCH_BACKEND, directory=BATCH_DIRECTORY):
+    """Submit requests (custom_id -> chat completion body) to the batch backend and return the batch id."""
+    if backend == "local":
+        batch_id = f"local_{uuid.uuid4().hex}"
+        batch_directory = local_batch_directory(batch_id, directory)
+        os.makedirs(batch_directory)
+        write_batch_input(requests, os.path.join(batch_directory, "input.jsonl"))
+        write_local_status(batch_directory, "validating")
+        return batch_id
+
+    os.makedirs(directory, exist_ok=True)
+    input_path = os.path.join(directory, f"input_{uuid.uuid4().hex}.jsonl")
+    write_batch_input(requests, input_path)
+    with open(input_path, "rb") as f:
+        input_file = openai.files.create(file=f, purpose="batch")
+    batch = openai.batches.create(
+        input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window=BATCH_COMPLETION_WINDOW
+    )
+    os.unlink(input_path)
+    return batch.id
+
+
+# This function asks the backend how far along a batch is.
+def get_batch_status(batch_id, backend=BATCH_BACKEND, directory=BATCH_DIRECTORY):
+    if backend == "local":
+        status_path = os.path.join(local_batch_directory(batch_id, directory), "status.json")
+        with open(status_path, "r", encoding="utf-8") as f:
+            return json.load(f)["status"]
+    return openai.batches.retrieve(batch_id).status
+
+
+# This function reads batch output lines into {custom_id: response body}, using None for failed requests.
+def parse_batch_output(text, results):
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        results[record["custom_id"]] = response.get("body") if response.get("status_code") == 200 else None
+    return results
+
+
+# This function fetches a finished batch's results.
+def download_batch_results(batch_id, backend=BATCH_BACKEND, directory=BATCH_DIRECTORY):
+    """Return {custom_id: chat completion body}, with None for each request the batch reported as failed."""
+    results = {}
+    if backend == "local":
+        output_path = os.path.join(local_batch_directory(batch_id, directory), "output.jsonl")
+        if os.path.isfile(output_path):
+            with open(output_path, "r", encoding="utf-8") as f:
+                parse_batch_output(f.read(), results)
+        return results
+    batch = openai.batches.retrieve(batch_id)
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            parse_batch_output(openai.files.content(file_id).text, results)
+    return results
+
+
+# This function waits for a batch to finish.
+def wait_for_batch(
+    batch_id, backend=BATCH_BACKEND, directory=BATCH_DIRECTORY, poll_seconds=BATCH_POLL_SECONDS, on_poll=None
+):
+    """Poll until the batch reaches a final status and return it, calling on_poll() between checks."""
+    while True:
+        status = get_batch_status(batch_id, backend, directory)
+        if status in FINISHED_STATUSES:
+            return status
+        if on_poll is not None:
+            on_poll()
+        time.sleep(poll_seconds)
+
+
+# This function answers one local batch through the regular chat endpoint.
+def process_local_batch(batch_directory):
+    write_local_status(batch_directory, "in_progress")
+    completed = 0
+    failed = 0
+    output_lines = []
+    with open(os.path.join(batch_directory, "input.jsonl"), "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                completion = openai.chat.completions.create(**request["body"])
+                response = {"status_code": 200, "body": completion.model_dump()}
+                error = None
+                completed += 1
+            except Exception as e:
+                response = None
+                error = {"message": str(e)}
+                failed += 1
+            output_lines.append(json.dumps({"custom_id": request["custom_id"], "response": response, "error": error}))
+    output_path = os.path.join(batch_directory, "output.jsonl")
+    with open(f"{output_path}.tmp", "w", encoding="utf-8") as f:
+        f.write("\n".join(output_lines) + "\n")
+    os.replace(f"{output_path}.tmp", output_path)
+    write_local_status(batch_directory, "completed", completed, failed)
+    return completed, failed
+
+
+# This function runs the local stand-in for the provider's batch service.
+def serve_local_batches(directory=BATCH_DIRECTORY, poll_seconds=1.0, once=False):
+    """Answer every submitted local batch, oldest first, until interrupted (or after one sweep with once=True).
+
+    Requests go to whatever endpoint the OpenAI client is configured for, so pointing OPENAI_BASE_URL at a
+    local model server gives a fully offline stand-in.
+    """
+    local_directory = os.path.join(directory, "local")
+    while True:
+        batch_directories = []
+        if os.path.isdir(local_directory):
+            batch_directories = [os.path.join(local_directory, name) for name in os.listdir(local_directory)]
+        batch_directories.sort(key=os.path.getmtime)
+        for batch_directory in batch_directories:
+            try:
+                with open(os.path.join(batch_directory, "status.json"), "r", encoding="utf-8") as f:
+                    status = json.load(f)["status"]
+            except (IOError, ValueError, KeyError):
+                continue
+            if status != "validating":
+                continue
+            completed, failed = process_local_batch(batch_directory)
+            batch_id = os.path.basename(batch_directory)
+            print(f"{Colors.GREEN}Answered batch {batch_id}: {completed} ok, {failed} failed{Colors.RESET}")
+        if once:
+            return
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the provider's batch service.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subcommands.add_parser("serve", help="Answer batches submitted with BATCH_BACKEND=local.")
+    serve_parser.add_argument("--poll", type=float, default=1.0, help="Seconds between checks for new batches.")
+    serve_parser.add_argument("--once", action="store_true", help="Answer the waiting batches and exit.")
+    status_parser = subcommands.add_parser("status", help="Print a batch's status.")
+    status_parser.add_argument("batch_id")
+    arguments = parser.parse_args()
+
+    if arguments.command == "serve":
+        serve_local_batches(poll_seconds=arguments.poll, once=arguments.once)
+    else:
+        backend = "local" if arguments.batch_id.startswith("local_") else BATCH_BACKEND
+        print(get_batch_status(arguments.batch_id, backend))
@@ -1,7 +1,13 @@
 # This file makes the AI talk to OpenAI for us.
+import contextvars
+import hashlib
+import json
+import threading
+
 import openai
 
 from config import MODEL_PARAMETERS
+from services.tracing import trace_span
 
 
 class Colors:
@@ -16,17 +22,108 @@ class Colors:
     RESET = "\033[0m"
 
 
+OUTPUT_STATS_LOCK = threading.Lock()
+OUTPUT_STATS = {}
+ACTIVE_BATCH = contextvars.ContextVar("active_batch", default=None)
+
+
+class BatchRequestPending(Exception):
+    """Raised when a chat request was queued for the next batch instead of being answered."""
+
+
+class BatchCollection:
+    """Answers chat requests from finished batch results and queues the rest for the next batch."""
+
+    def __init__(self, responses, scope=""):
+        self.responses = responses
+        self.scope = scope
+        self.pending = {}
+        self.answered = set()
+        self.token = None
+
+    def __enter__(self):
+        self.token = ACTIVE_BATCH.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ACTIVE_BATCH.reset(self.token)
+        return False
+
+    def respond(self, request_body):
+        custom_id = batch_request_id(request_body, self.scope)
+        if custom_id not in self.responses:
+            self.pending[custom_id] = request_body
+            raise BatchRequestPending(custom_id)
+        self.answered.add(custom_id)
+        response_body = self.responses[custom_id]
+        # A request the batch reported as failed reads as an empty reply, like a failed live call.
+        if not response_body:
+            return ""
+        choice = response_body["choices"][0]
+        record_output_usage(
+            request_body.get("model"),
+            choice.get("finish_reason"),
+            (response_body.get("usage") or {}).get("completion_tokens", 0),
+        )
+        return (choice["message"].get("content") or "").strip()
+
+
+# This function names a request by its contents so a batch result can be matched back to it.
+def batch_request_id(request_body, scope=""):
+    """Hash scope (e.g. the session id) with the request, so identical prompts in two sessions stay separate."""
+    encoded = json.dumps([scope, request_body], sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:40]
+
+
+# This function checks whether chat requests are currently being gathered into a batch.
+def batch_collection_active():
+    return ACTIVE_BATCH.get() is not None
+
+
 # This function asks OpenAI for a reply.
 def generate_chat_response(messages, model_overrides=None):
-    """Generates a chat response using the OpenAI API."""
+    """Generates a chat response using the OpenAI API.
+
+    Inside a BatchCollection the reply comes from finished batch results instead, and a request
+    with no result yet is queued and raises BatchRequestPending.
+    """
+    request_parameters = dict(MODEL_PARAMETERS)
+    if isinstance(model_overrides, dict):
+        request_parameters.update(model_overrides)
+    elif isinstance(model_overrides, str):
+        request_parameters["model"] = model_overrides
+    batch = ACTIVE_BATCH.get()
+    if batch is not None:
+        return batch.respond(dict(request_parameters, messages=messages))
     try:
-        request_parameters = dict(MODEL_PARAMETERS)
-        if isinstance(model_overrides, dict):
-            request_parameters.update(model_overrides)
-        elif isinstance(model_overrides, str):
-            request_parameters["model"] = model_overrides
-        completion = openai.chat.completions.create(**request_parameters, messages=messages)
-        return completion.choices[0].message.content.strip()
+        content, finish_reason = request_completion(request_parameters, messages)
+        if not content and finish_reason == "length" and "max_completion_tokens" in request_parameters:
+            # Reasoning tokens can use up the whole cap before any reply is written; ask once more uncapped.
+            print(f"{Colors.YELLOW}Empty reply hit the output cap; retrying without it{Colors.RESET}")
+            del request_parameters["max_completion_tokens"]
+            content, finish_reason = request_completion(request_parameters, messages)
+        return content
     except Exception as e:
         print(f"Error generating chat response: {e}")
         return ""
+
+
+# This function makes one chat completion call and returns its text and finish reason.
+def request_completion(request_parameters, messages):
+    with trace_span("chat completion", "api", model=request_parameters.get("model")):
+        completion = openai.chat.completions.create(**request_parameters, messages=messages)
+    usage = getattr(completion, "usage", None)
+    finish_reason = getattr(completion.choices[0], "finish_reason", None)
+    record_output_usage(request_parameters.get("model"), finish_reason, getattr(usage, "completion_tokens", 0))
+    return (completion.choices[0].message.content or "").strip(), finish_reason
+
+
+# This function tallies output length and cut-off replies per model.
+def record_output_usage(model, finish_reason, completion_tokens):
+    completion_tokens = completion_tokens or 0
+    with OUTPUT_STATS_LOCK:
+        stats = OUTPUT_STATS.setdefault(model, {"calls": 0, "truncated": 0, "completion_tokens": 0})
+        stats["calls"] += 1
+        stats["completion_tokens"] += completion_tokens
+        if finish_reason == "length":
+            stats["truncated"] += 1
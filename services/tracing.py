@@ -0,0 +1,130 @@
+# This file records nested timing spans and writes them as Chrome Trace Event JSON.
+import contextvars
+import json
+import os
+import threading
+import time
+
+from config import TRACE_DIRECTORY, TRACING_ENABLED
+
+
+ACTIVE_TRACE = contextvars.ContextVar("active_trace", default=None)
+
+
+class NoopSpan:
+    """Shared do-nothing span handed out when tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    """Times a block and appends it to the active trace as a complete ("X") event."""
+
+    def __init__(self, trace, name, category, args):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.args = args
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        finished = time.perf_counter_ns()
+        thread = threading.current_thread()
+        event = {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": (self.started - self.trace["origin"]) / 1000,
+            "dur": (finished - self.started) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": dict(self.args),
+        }
+        if exc_type is not None:
+            event["args"]["error"] = f"{exc_type.__name__}: {exc_value}"
+        with self.trace["lock"]:
+            self.trace["events"].append(event)
+            self.trace["threads"][thread.ident] = thread.name
+        return False
+
+
+class TraceSession:
+    """Collects every span for one debate and writes them to TRACE_DIRECTORY on exit."""
+
+    def __init__(self, session_id, args):
+        self.trace = {
+            "session_id": session_id,
+            "origin": time.perf_counter_ns(),
+            "events": [],
+            "threads": {},
+            "lock": threading.Lock(),
+        }
+        self.root_span = Span(self.trace, "session", "session", dict(args, session_id=session_id))
+        self.token = None
+
+    def __enter__(self):
+        self.token = ACTIVE_TRACE.set(self.trace)
+        self.root_span.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.root_span.__exit__(exc_type, exc_value, traceback)
+        ACTIVE_TRACE.reset(self.token)
+        write_chrome_trace(self.trace)
+        return False
+
+
+# This function opens a span inside the current debate's trace.
+def trace_span(name, category, **args):
+    """Return a context manager timing the enclosed block (a shared no-op when tracing is off)."""
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    trace = ACTIVE_TRACE.get()
+    if trace is None:
+        return NOOP_SPAN
+    return Span(trace, name, category, args)
+
+
+# This function starts a new trace covering one whole debate.
+def trace_session(session_id, **args):
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    return TraceSession(session_id, args)
+
+
+# This function lets work handed to another thread keep adding to the same trace.
+def carry_trace_context(function):
+    if not TRACING_ENABLED:
+        return function
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(function, *args, **kwargs)
+
+
+# This function saves a finished trace where Perfetto or chrome://tracing can open it.
+def write_chrome_trace(trace, directory=TRACE_DIRECTORY):
+    file_name = os.path.join(directory, f"{trace['session_id']}.json")
+    with trace["lock"]:
+        events = list(trace["events"])
+        threads = dict(trace["threads"])
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+        for tid, name in threads.items()
+    ]
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        print(f"Trace saved to {file_name}")
+    except IOError as e:
+        print(f"Error saving trace: {e}")
@@ -0,0 +1,263 @@
+# This file exports finished sessions as partitioned Parquet tables for analytics.
+import argparse
+import os
+from datetime import datetime, timezone
+
+from config import ANALYTICS_DIRECTORY
+from storage.checkpoints import new_session_id
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+if pa is not None:
+    TABLE_SCHEMAS = {
+        "turns": pa.schema(
+            [
+                ("session_id", pa.string()),
+                ("tier", pa.string()),
+                ("round", pa.int16()),
+                ("model", pa.string()),
+                ("model_id", pa.string()),
+                ("stance", pa.string()),
+                ("conceded_to", pa.string()),
+                ("content_length", pa.int32()),
+                ("valid", pa.bool_()),
+                ("attempts", pa.int8()),
+            ]
+        ),
+        "sessions": pa.schema(
+            [
+                ("session_id", pa.string()),
+                ("recorded_at", pa.timestamp("s", tz="UTC")),
+                ("tier", pa.string()),
+                ("rounds", pa.int16()),
+                ("debate_winner", pa.string()),
+                ("verdict", pa.string()),
+                ("judge_winner", pa.string()),
+                ("agree_votes", pa.int16()),
+                ("disagree_votes", pa.int16()),
+                ("inferred_votes", pa.int16()),
+                ("dissenters", pa.list_(pa.string())),
+                ("debate_seconds", pa.float64()),
+                ("judge_seconds", pa.float64()),
+                ("consensus_seconds", pa.float64()),
+                ("writer_seconds", pa.float64()),
+                ("total_seconds", pa.float64()),
+            ]
+        ),
+    }
+    DATE_PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+# This function turns a result's debater turns into one row each.
+def build_turn_rows(result, session_id):
+    rows = []
+    for entry in result.get("turns") or []:
+        # Judge entries use a label instead of a round number.
+        if not isinstance(entry.get("round"), int):
+            continue
+        conceded_to = entry.get("conceded_to")
+        rows.append(
+            {
+                "session_id": session_id,
+                "tier": result.get("tier"),
+                "round": entry["round"],
+                "model": entry.get("model"),
+                "model_id": entry.get("model_id"),
+                "stance": entry.get("stance"),
+                "conceded_to": conceded_to if isinstance(conceded_to, str) else None,
+                "content_length": len(entry.get("content") or ""),
+                "valid": entry.get("valid", True),
+                "attempts": entry.get("attempts", 1),
+            }
+        )
+    return rows
+
+
+# This function summarizes a result as a single session row.
+def build_session_row(result, session_id, recorded_at):
+    judge = result.get("judge") or {}
+    consensus = result.get("consensus") or {}
+    timings = result.get("timings") or {}
+    judge_winner = judge.get("winner")
+    verdict = judge.get("verdict")
+    return {
+        "session_id": session_id,
+        "recorded_at": recorded_at,
+        "tier": result.get("tier"),
+        "rounds": result.get("rounds", 0),
+        "debate_winner": result.get("winner"),
+        "verdict": str(verdict).lower() if verdict else None,
+        "judge_winner": judge_winner if isinstance(judge_winner, str) else None,
+        "agree_votes": sum(1 for vote in consensus.values() if vote.get("agreement") == "agree"),
+        "disagree_votes": sum(1 for vote in consensus.values() if vote.get("agreement") != "agree"),
+        "inferred_votes": sum(1 for vote in consensus.values() if vote.get("inferred")),
+        "dissenters": [label for label, vote in consensus.items() if vote.get("agreement") != "agree"],
+        "debate_seconds": timings.get("debate_seconds"),
+        "judge_seconds": timings.get("judge_seconds"),
+        "consensus_seconds": timings.get("consensus_seconds"),
+        "writer_seconds": timings.get("writer_seconds"),
+        "total_seconds": timings.get("total_seconds"),
+    }
+
+
+# This function writes rows into one table's date partition.
+def write_partition(rows, table_name, date, file_stem, directory):
+    partition_directory = os.path.join(directory, table_name, f"date={date}")
+    os.makedirs(partition_directory, exist_ok=True)
+    file_name = os.path.join(partition_directory, f"{file_stem}.parquet")
+    # Dot-prefixed files are skipped by dataset discovery, so readers never see a half-written file.
+    temporary_name = os.path.join(partition_directory, f".{file_stem}.parquet.tmp")
+    table = pa.Table.from_pylist(rows, schema=TABLE_SCHEMAS[table_name])
+    pq.write_table(table, temporary_name, compression="zstd")
+    os.replace(temporary_name, file_name)
+    return file_name
+
+
+# This function exports a finished session's turns and outcome.
+def export_debate_result(result, directory=ANALYTICS_DIRECTORY):
+    """Write result as <directory>/{turns,sessions}/date=YYYY-MM-DD/<session_id>.parquet.
+
+    The date= folders are Hive-style partitions, so readers that filter on date only open
+    the matching days. Returns the session file written, or None if nothing was written.
+    """
+    if pa is None:
+        print("Analytics export skipped: install pyarrow to enable it")
+        return None
+    session_id = result.get("session_id") or new_session_id()
+    recorded_at = datetime.now(timezone.utc).replace(microsecond=0)
+    date = recorded_at.date().isoformat()
+    try:
+        turn_rows = build_turn_rows(result, session_id)
+        if turn_rows:
+            write_partition(turn_rows, "turns", date, session_id, directory)
+        session_row = build_session_row(result, session_id, recorded_at)
+        return write_partition([session_row], "sessions", date, session_id, directory)
+    except (IOError, pa.ArrowException) as e:
+        print(f"Error exporting analytics: {e}")
+        return None
+
+
+# This function loads one exported table, optionally only from a given date onward.
+def read_analytics_table(table_name, since=None, directory=ANALYTICS_DIRECTORY):
+    table_directory = os.path.join(directory, table_name)
+    if not os.path.isdir(table_directory):
+        return None
+    dataset = ds.dataset(
+        table_directory,
+        format="parquet",
+        schema=TABLE_SCHEMAS[table_name].append(pa.field("date", pa.string())),
+        partitioning=DATE_PARTITIONING,
+    )
+    row_filter = ds.field("date") >= since if since else None
+    return dataset.to_table(filter=row_filter)
+
+
+# This function merges each partition's per-session files into one file.
+def compact_analytics(directory=ANALYTICS_DIRECTORY):
+    """Rewrite every date partition holding more than one file as a single part-0.parquet.
+
+    Returns the number of partitions compacted.
+    """
+    compacted = 0
+    for table_name, schema in TABLE_SCHEMAS.items():
+        table_directory = os.path.join(directory, table_name)
+        if not os.path.isdir(table_directory):
+            continue
+        for partition_name in sorted(os.listdir(table_directory)):
+            partition_directory = os.path.join(table_directory, partition_name)
+            if not os.path.isdir(partition_directory):
+                continue
+            files = sorted(
+                os.path.join(partition_directory, file_name)
+                for file_name in os.listdir(partition_directory)
+                if file_name.endswith(".parquet")
+            )
+            if len(files) < 2:
+                continue
+            table = ds.dataset(files, format="parquet", schema=schema).to_table()
+            target = os.path.join(partition_directory, "part-0.parquet")
+            temporary_name = os.path.join(partition_directory, ".part-0.parquet.tmp")
+            pq.write_table(table, temporary_name, compression="zstd")
+            os.replace(temporary_name, target)
+            for file_name in files:
+                if file_name != target:
+                    os.unlink(file_name)
+            compacted += 1
+    return compacted
+
+
+# This function counts rows per key and returns them as {key: count}.
+def count_by(table, column):
+    counts = table.group_by(column).aggregate([([], "count_all")])
+    return dict(zip(counts[column].to_pylist(), counts["count_all"].to_pylist()))
+
+
+# This function reports win rates, verdicts, concessions, retries, and latency across exported sessions.
+def format_analytics_summary(since=None, directory=ANALYTICS_DIRECTORY):
+    if pa is None:
+        return "Analytics: install pyarrow to read exported sessions"
+    sessions = read_analytics_table("sessions", since, directory)
+    if sessions is None or sessions.num_rows == 0:
+        return "Analytics: no sessions exported yet"
+    debates = sessions.filter(pc.is_valid(sessions["verdict"]))
+    lines = [f"Sessions: {sessions.num_rows} ({debates.num_rows} debated)"]
+
+    for tier, count in sorted(count_by(sessions, "tier").items(), key=lambda item: str(item[0])):
+        if tier is None:
+            tier_sessions = sessions.filter(pc.is_null(sessions["tier"]))
+        else:
+            tier_sessions = sessions.filter(pc.equal(sessions["tier"], tier))
+        average = pc.mean(tier_sessions["total_seconds"]).as_py() or 0.0
+        lines.append(f"- tier {tier or 'unrouted'}: {count} sessions, avg {average:.1f}s")
+
+    if debates.num_rows:
+        lines.append("Verdicts:")
+        for verdict, count in sorted(count_by(debates, "verdict").items(), key=lambda item: -item[1]):
+            lines.append(f"- {verdict}: {count} ({count / debates.num_rows * 100:.0f}%)")
+        winners = debates.filter(pc.is_valid(debates["judge_winner"]))
+        if winners.num_rows:
+            lines.append("Win rate (judge winner):")
+            for winner, count in sorted(count_by(winners, "judge_winner").items(), key=lambda item: -item[1]):
+                lines.append(f"- {winner}: {count / debates.num_rows * 100:.0f}%")
+
+    turns = read_analytics_table("turns", since, directory)
+    if turns is not None and turns.num_rows:
+        turns = turns.append_column("retried", pc.greater(turns["attempts"], 1))
+        turns = turns.append_column("conceded", pc.equal(turns["stance"], "concede"))
+        per_model = turns.group_by("model").aggregate(
+            [("retried", "mean"), ("valid", "mean"), ("conceded", "sum"), ([], "count_all")]
+        )
+        concessions = turns.filter(turns["conceded"]).group_by("model").aggregate([("round", "mean")])
+        concession_rounds = dict(zip(concessions["model"].to_pylist(), concessions["round_mean"].to_pylist()))
+        lines.append("Debater turns:")
+        for row in sorted(per_model.to_pylist(), key=lambda row: str(row["model"])):
+            concession_round = concession_rounds.get(row["model"])
+            concession_text = f", avg concession round {concession_round:.1f}" if concession_round else ""
+            lines.append(
+                f"- {row['model']}: {row['count_all']} turns, {row['retried_mean'] * 100:.0f}% retried, "
+                f"{(1 - row['valid_mean']) * 100:.0f}% invalid, {row['conceded_sum']} concessions{concession_text}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or compact exported session analytics.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    summary_parser = subcommands.add_parser("summary", help="Print win rates, verdicts, retries, and latency.")
+    summary_parser.add_argument("--since", help="Only include partitions from this date (YYYY-MM-DD) onward.")
+    subcommands.add_parser("compact", help="Merge each date partition into a single file.")
+    arguments = parser.parse_args()
+
+    if pa is None:
+        print("Install pyarrow to use the analytics export.")
+    elif arguments.command == "compact":
+        print(f"Compacted {compact_analytics()} partition(s)")
+    else:
+        print(format_analytics_summary(arguments.since))
@@ -0,0 +1,210 @@
+# This file stores conversations as compressed archives that can load a single turn at a time.
+import argparse
+import ast
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+
+
+ARCHIVE_MAGIC = b"DGA1"
+FOOTER_MAGIC = b"DGAX"
+FOOTER_FORMAT = "<QI4s"
+FOOTER_SIZE = struct.calcsize(FOOTER_FORMAT)
+ARCHIVE_EXTENSION = ".dga"
+MESSAGE_START_PATTERN = re.compile(r"^(system|user|assistant): ?(.*)$")
+
+
+# This function finds the archive file for a conversation.
+def archive_path(conversation_id, directory="conversations_archive"):
+    return os.path.join(directory, f"{conversation_id}{ARCHIVE_EXTENSION}")
+
+
+# This function writes a conversation as one compressed frame per message.
+def save_conversation_archive(conversation, conversation_id, directory="conversations_archive"):
+    """Write conversation to <directory>/<id>.dga and return True if the archive was written.
+
+    Layout: magic, one zlib frame per message, a JSON offset index, and a fixed-size footer
+    pointing at the index, so any single message can be read without inflating the rest.
+    """
+    file_name = archive_path(conversation_id, directory)
+    temporary_name = f"{file_name}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temporary_name, "wb") as f:
+            f.write(ARCHIVE_MAGIC)
+            index = []
+            for message in conversation:
+                frame = zlib.compress(json.dumps(message, ensure_ascii=False).encode("utf-8"), 9)
+                index.append([f.tell(), len(frame), message.get("role", "")])
+                f.write(frame)
+            index_offset = f.tell()
+            index_bytes = json.dumps(index).encode("utf-8")
+            f.write(index_bytes)
+            f.write(struct.pack(FOOTER_FORMAT, index_offset, len(index_bytes), FOOTER_MAGIC))
+        os.replace(temporary_name, file_name)
+        print(f"Conversation archived to {file_name}")
+        return True
+    except IOError as e:
+        print(f"Error archiving conversation: {e}")
+        return False
+
+
+# This function reads an archive's offset index from its footer.
+def read_archive_index(mapped):
+    if mapped[: len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+        raise ValueError("Not a conversation archive")
+    index_offset, index_length, footer_magic = struct.unpack(FOOTER_FORMAT, mapped[-FOOTER_SIZE:])
+    if footer_magic != FOOTER_MAGIC:
+        raise ValueError("Conversation archive footer is damaged")
+    return json.loads(mapped[index_offset : index_offset + index_length].decode("utf-8"))
+
+
+# This function inflates one message frame from the mapped archive.
+def read_frame(mapped, entry):
+    offset, length = entry[0], entry[1]
+    return json.loads(zlib.decompress(mapped[offset : offset + length]).decode("utf-8"))
+
+
+# This function loads a single message from an archive without touching the others.
+def read_archived_turn(conversation_id, message_index, directory="conversations_archive"):
+    """Return message number message_index (0-based, system message included) from the archive."""
+    with open(archive_path(conversation_id, directory), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            index = read_archive_index(mapped)
+            return read_frame(mapped, index[message_index])
+
+
+# This function loads every message from an archive.
+def read_archived_conversation(conversation_id, directory="conversations_archive"):
+    with open(archive_path(conversation_id, directory), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return [read_frame(mapped, entry) for entry in read_archive_index(mapped)]
+
+
+# This function lists archived conversation ids.
+def list_archived_conversations(directory="conversations_archive"):
+    if not os.path.isdir(directory):
+        return []
+    conversation_ids = []
+    for file_name in os.listdir(directory):
+        conversation_id, extension = os.path.splitext(file_name)
+        if extension == ARCHIVE_EXTENSION and conversation_id.isdigit():
+            conversation_ids.append(conversation_id)
+    return sorted(conversation_ids, key=int)
+
+
+# This function reads a saved markdown conversation back into messages.
+def parse_conversation_markdown(file_path):
+    """Parse a conversations/<id>.md file written by save_conversation into role/content dicts."""
+    messages = []
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            match = MESSAGE_START_PATTERN.match(line)
+            if match:
+                messages.append({"role": match.group(1), "content": match.group(2)})
+            elif messages:
+                messages[-1]["content"] += "\n" + line
+    for message in messages:
+        message["content"] = message["content"].strip()
+    return messages
+
+
+# This function reads a conversations_data/<id>.py file without importing it.
+def parse_conversation_data_file(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    return ast.literal_eval(source.split("=", 1)[1].strip())
+
+
+# This function lays out messages exactly as save_conversation writes them.
+def render_conversation_markdown(conversation):
+    return "".join(f"{message['role']}: {message['content']}\n" for message in conversation)
+
+
+# This function reads a whole text file.
+def read_text(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# This function converts saved markdown/data files into compressed archives.
+def compact_conversations(
+    directory="conversations",
+    data_directory="conversations_data",
+    archive_directory="conversations_archive",
+    remove_originals=False,
+):
+    """Archive every numbered conversation from whichever of its .md/.py copies was saved last.
+
+    `s` and `d` save independently, so one copy can be behind the other. With remove_originals the
+    copies are only deleted when the archive was written from the .py copy and any .md copy matches
+    it byte for byte; a conversation saved only as markdown is always kept.
+    Returns (conversations archived, bytes before, bytes after).
+    """
+    sources = {}
+    for source_directory, extension in ((directory, ".md"), (data_directory, ".py")):
+        if not os.path.isdir(source_directory):
+            continue
+        for file_name in os.listdir(source_directory):
+            conversation_id, file_extension = os.path.splitext(file_name)
+            if file_extension == extension and conversation_id.isdigit():
+                sources.setdefault(conversation_id, {})[extension] = os.path.join(source_directory, file_name)
+
+    archived = 0
+    bytes_before = 0
+    bytes_after = 0
+    for conversation_id in sorted(sources, key=int):
+        paths = sources[conversation_id]
+        try:
+            copies = {}
+            if ".py" in paths:
+                copies[".py"] = parse_conversation_data_file(paths[".py"])
+            if ".md" in paths:
+                copies[".md"] = parse_conversation_markdown(paths[".md"])
+        except (IOError, SyntaxError, ValueError) as e:
+            print(f"Error reading conversation {conversation_id}: {e}")
+            continue
+        # The data file round-trips exactly, so it wins unless the markdown copy was saved after it.
+        newest = max(paths, key=lambda extension: (os.path.getmtime(paths[extension]), extension == ".py"))
+        conversation = copies[newest]
+        if not save_conversation_archive(conversation, conversation_id, archive_directory):
+            continue
+        archived += 1
+        bytes_before += sum(os.path.getsize(path) for path in paths.values())
+        bytes_after += os.path.getsize(archive_path(conversation_id, archive_directory))
+        if not remove_originals:
+            continue
+        # Message text can itself contain "user:" lines, so a markdown copy cannot be read back
+        # reliably; only an archive built from the data file is safe to keep on its own.
+        if newest != ".py":
+            print(f"Keeping the originals of conversation {conversation_id}: archived from its .md copy")
+            continue
+        if ".md" in paths and read_text(paths[".md"]) != render_conversation_markdown(conversation):
+            print(f"Keeping the originals of conversation {conversation_id}: its .md and .py copies differ")
+            continue
+        for path in paths.values():
+            os.unlink(path)
+    return archived, bytes_before, bytes_after
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compress saved conversations into per-turn archives.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    compact_parser = subcommands.add_parser("compact", help="Archive conversations/ and conversations_data/.")
+    compact_parser.add_argument("--remove-originals", action="store_true", help="Delete the .md/.py copies.")
+    show_parser = subcommands.add_parser("show", help="Print one archived message.")
+    show_parser.add_argument("conversation_id")
+    show_parser.add_argument("message_index", type=int)
+    arguments = parser.parse_args()
+
+    if arguments.command == "compact":
+        archived, bytes_before, bytes_after = compact_conversations(remove_originals=arguments.remove_originals)
+        ratio = (bytes_after / bytes_before * 100) if bytes_before else 0
+        print(f"Archived {archived} conversation(s): {bytes_before} → {bytes_after} bytes ({ratio:.0f}%)")
+    else:
+        message = read_archived_turn(arguments.conversation_id, arguments.message_index)
+        print(f"{message['role']}: {message['content']}")
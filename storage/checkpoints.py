@@ -0,0 +1,107 @@
+# This file keeps a write-ahead log of finished debate stages so a crashed debate can resume.
+import json
+import os
+import threading
+import uuid
+
+# Session ids of debates run by queue workers start with this; those workers resume them on retry.
+JOB_SESSION_PREFIX = "job-"
+
+
+# This function makes a fresh id for a debate session.
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+# This function finds the log file for a session.
+def checkpoint_path(session_id, directory="checkpoints"):
+    return os.path.join(directory, f"{session_id}.jsonl")
+
+
+# This function checks whether a session has an unfinished log on disk.
+def checkpoint_exists(session_id, directory="checkpoints"):
+    return os.path.isfile(checkpoint_path(session_id, directory))
+
+
+# This function opens a session's log and replays the stages already on disk.
+def open_checkpoint(session_id, directory="checkpoints"):
+    """Return a checkpoint handle holding every stage previously logged for session_id."""
+    file_path = checkpoint_path(session_id, directory)
+    stages = {}
+    if os.path.isfile(file_path):
+        try:
+            with open(file_path, "r+b") as f:
+                valid_length = 0
+                for line in f:
+                    try:
+                        record = json.loads(line.decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        # A torn final line means the process died mid-write; drop it so that stage reruns.
+                        f.truncate(valid_length)
+                        break
+                    stages[record["stage"]] = record["data"]
+                    valid_length += len(line)
+        except IOError as e:
+            print(f"Error reading checkpoint {file_path}: {e}")
+    return {"session_id": session_id, "path": file_path, "stages": stages, "lock": threading.Lock()}
+
+
+# This function looks up a stage that already finished, if any.
+def get_checkpoint_stage(checkpoint, stage):
+    if checkpoint is None:
+        return None
+    with checkpoint["lock"]:
+        return checkpoint["stages"].get(stage)
+
+
+# This function appends a finished stage to the log and flushes it to disk.
+def save_checkpoint_stage(checkpoint, stage, data):
+    """Durably append stage -> data to the session log (no-op when checkpoint is None)."""
+    if checkpoint is None:
+        return
+    line = json.dumps({"stage": stage, "data": data}, ensure_ascii=False, default=str)
+    with checkpoint["lock"]:
+        try:
+            os.makedirs(os.path.dirname(checkpoint["path"]) or ".", exist_ok=True)
+            with open(checkpoint["path"], "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except IOError as e:
+            print(f"Error writing checkpoint {checkpoint['path']}: {e}")
+        checkpoint["stages"][stage] = data
+
+
+# This function deletes a session's log once the debate has finished.
+def finish_checkpoint(checkpoint):
+    if checkpoint is None:
+        return
+    with checkpoint["lock"]:
+        try:
+            if os.path.isfile(checkpoint["path"]):
+                os.unlink(checkpoint["path"])
+        except IOError as e:
+            print(f"Error removing checkpoint {checkpoint['path']}: {e}")
+
+
+# This function lists debates that stopped before finishing.
+def list_incomplete_sessions(directory="checkpoints", exclude=()):
+    """Return (session_id, header) pairs for the checkpoint logs left on disk.
+
+    Sessions in exclude (debates still running here) and queue workers' job sessions are left out,
+    since resuming either would run a second copy on the same log.
+    """
+    if not os.path.isdir(directory):
+        return []
+    sessions = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(".jsonl"):
+            continue
+        session_id = file_name[: -len(".jsonl")]
+        # Skipped before opening, since opening a log can truncate a line another debate is writing.
+        if session_id in exclude or session_id.startswith(JOB_SESSION_PREFIX):
+            continue
+        header = open_checkpoint(session_id, directory)["stages"].get("session")
+        if header is not None:
+            sessions.append((session_id, header))
+    return sessions
@@ -2,6 +2,9 @@
 import importlib
 import os
 
+from storage.archive import archive_path, read_archived_conversation
+from storage.search_index import clear_search_index, index_conversation
+
 
 # This function writes the chat history to a markdown file.
 def save_conversation(conversation, conversation_id, directory="conversations"):
@@ -16,6 +19,8 @@ def save_conversation(conversation, conversation_id, directory="conversations"):
         print(f"Conversation saved to {file_name}")
     except IOError as e:
         print(f"Error saving conversation: {e}")
+        return
+    index_conversation(conversation, conversation_id)
 
 
 # This function copies the chat history into the transcript file.
@@ -67,14 +72,20 @@ def save_conversations_and_data(conversation, conversation_id):
     save_conversation_data(conversation, conversation_id)
 
 
-# This function loads a past chat history by id.
-def get_conversation_data(history_id):
+# This function loads a past chat history by id, falling back to the compressed archive.
+def get_conversation_data(history_id, data_directory="conversations_data", archive_directory="conversations_archive"):
+    if not os.path.isfile(f"{data_directory}/{history_id}.py") and os.path.isfile(
+        archive_path(history_id, archive_directory)
+    ):
+        return read_archived_conversation(history_id, archive_directory)
     module = importlib.import_module(f"conversations_data.{history_id}")
     return module.history
 
 
 # This function clears out numbered conversation logs.
-def clear_conversations_and_data(directory="conversations", data_directory="conversations_data"):
+def clear_conversations_and_data(
+    directory="conversations", data_directory="conversations_data", archive_directory="conversations_archive"
+):
     """Clears the conversation and conversation data files."""
     try:
         for file in os.listdir(directory):
@@ -94,6 +105,18 @@ def clear_conversations_and_data(directory="conversations", data_directory="conv
     except IOError as e:
         print(f"Error clearing conversation data: {e}")
 
+    if os.path.isdir(archive_directory):
+        try:
+            for file in os.listdir(archive_directory):
+                file_path = os.path.join(archive_directory, file)
+                if os.path.isfile(file_path) and file.rsplit(".", 1)[0].isdigit():
+                    os.unlink(file_path)
+            print(f"Conversation archives cleared from {archive_directory}")
+        except IOError as e:
+            print(f"Error clearing conversation archives: {e}")
+
+    clear_search_index()
+
 
 # This function reads a canned user prompt from disk.
 def get_user_input_from_file(file_name="USER_INPUT.txt"):
@@ -120,10 +143,8 @@ def load_system_prompt(file_path="SYSTEM.md"):
 
 
 # This function picks the next unused conversation id.
-def find_next_conversation_id(current_id, directory="conversations"):
+def find_next_conversation_id(current_id, directory="conversations", archive_directory="conversations_archive"):
     """Finds the next available conversation id to avoid overwriting files."""
-    file_name = f"{directory}/{current_id}.md"
-    while os.path.isfile(file_name):
+    while os.path.isfile(f"{directory}/{current_id}.md") or os.path.isfile(archive_path(current_id, archive_directory)):
         current_id += 1
-        file_name = f"{directory}/{current_id}.md"
     return current_id
@@ -0,0 +1,208 @@
+# This file keeps the shared queue of debate jobs that worker processes pull from.
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+from config import JOB_QUEUE_WAL
+
+
+JOB_STATUSES = ("pending", "leased", "done", "failed")
+
+
+# This function opens the queue database, creating it on first use.
+def open_job_queue(queue_path):
+    """Open (and initialise) the SQLite job queue at queue_path."""
+    directory = os.path.dirname(queue_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(queue_path, timeout=30, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    # The rollback journal works wherever file locks do; WAL is only safe when every worker is on one host.
+    connection.execute(f"PRAGMA journal_mode={'WAL' if JOB_QUEUE_WAL else 'DELETE'}")
+    connection.execute("PRAGMA busy_timeout=30000")
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            prompt TEXT NOT NULL,
+            system_prompt TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            completed_at REAL,
+            result TEXT,
+            error TEXT
+        )
+        """
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+    connection.execute("CREATE TABLE IF NOT EXISTS queue_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    connection.execute(
+        "INSERT OR IGNORE INTO queue_info (key, value) VALUES ('token', ?)", (uuid.uuid4().hex[:12],)
+    )
+    return connection
+
+
+# This function returns the random token minted when this queue file was created.
+def get_queue_token(connection):
+    """Job ids restart at 1 in a new queue file, so the token keeps session ids from different queues apart."""
+    return connection.execute("SELECT value FROM queue_info WHERE key = 'token'").fetchone()["value"]
+
+
+# This function adds new prompts to the back of the queue.
+def enqueue_jobs(connection, prompts, system_prompt=""):
+    """Insert one pending job per prompt and return the new job ids."""
+    now = time.time()
+    job_ids = []
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        for prompt in prompts:
+            cursor = connection.execute(
+                "INSERT INTO jobs (prompt, system_prompt, created_at) VALUES (?, ?, ?)",
+                (prompt, system_prompt or "", now),
+            )
+            job_ids.append(cursor.lastrowid)
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    return job_ids
+
+
+# This function hands the next available job to a worker under a lease.
+def claim_job(connection, worker_id, lease_seconds, max_attempts):
+    """Lease the oldest pending (or expired) job to worker_id, or return None if the queue is idle.
+
+    Jobs whose lease expired after max_attempts tries are marked failed instead of re-leased.
+    """
+    now = time.time()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute(
+            """
+            UPDATE jobs SET status = 'failed', error = 'Lease expired after final attempt', completed_at = ?
+            WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+            """,
+            (now, now, max_attempts),
+        )
+        row = connection.execute(
+            """
+            SELECT * FROM jobs
+            WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+            ORDER BY id LIMIT 1
+            """,
+            (now,),
+        ).fetchone()
+        if row is None:
+            connection.execute("COMMIT")
+            return None
+        connection.execute(
+            """
+            UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                attempts = attempts + 1, started_at = ?
+            WHERE id = ?
+            """,
+            (worker_id, now + lease_seconds, now, row["id"]),
+        )
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    job = dict(row)
+    job["attempts"] += 1
+    job["lease_owner"] = worker_id
+    return job
+
+
+# This function pushes a running job's lease further out so nobody steals it.
+def extend_lease(connection, job_id, worker_id, lease_seconds):
+    """Renew the lease on job_id; return False if worker_id no longer owns it."""
+    cursor = connection.execute(
+        "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+        (time.time() + lease_seconds, job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+
+# This function renews every lease a worker holds in one statement.
+def extend_worker_leases(connection, worker_id, lease_seconds):
+    """Renew all of worker_id's leases at once and return how many it still holds."""
+    cursor = connection.execute(
+        "UPDATE jobs SET lease_expires = ? WHERE status = 'leased' AND lease_owner = ?",
+        (time.time() + lease_seconds, worker_id),
+    )
+    return cursor.rowcount
+
+
+# This function stores a finished job's result.
+def complete_job(connection, job_id, worker_id, result):
+    """Record result for job_id; ignored if the lease was lost to another worker."""
+    cursor = connection.execute(
+        """
+        UPDATE jobs SET status = 'done', result = ?, error = NULL, completed_at = ?, lease_expires = NULL
+        WHERE id = ? AND status = 'leased' AND lease_owner = ?
+        """,
+        (json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+
+# This function puts a failed job back in line, or gives up after too many tries.
+def fail_job(connection, job_id, worker_id, error, max_attempts):
+    """Return job_id to the queue, or mark it failed once max_attempts is reached."""
+    cursor = connection.execute(
+        """
+        UPDATE jobs SET
+            status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+            error = ?, lease_owner = NULL, lease_expires = NULL,
+            completed_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END
+        WHERE id = ? AND status = 'leased' AND lease_owner = ?
+        """,
+        (max_attempts, str(error), max_attempts, time.time(), job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+
+# This function loads one job, including its stored result.
+def get_job(connection, job_id):
+    row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+# This function summarizes queue depth and recent throughput.
+def get_queue_status(connection, window_seconds=600):
+    """Return job counts per status plus completions per minute over the last window_seconds."""
+    now = time.time()
+    counts = {status: 0 for status in JOB_STATUSES}
+    for row in connection.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status"):
+        counts[row["status"]] = row["total"]
+    expired = connection.execute(
+        "SELECT COUNT(*) FROM jobs WHERE status = 'leased' AND lease_expires < ?", (now,)
+    ).fetchone()[0]
+    recent = connection.execute(
+        "SELECT COUNT(*), AVG(completed_at - started_at) FROM jobs WHERE status = 'done' AND completed_at >= ?",
+        (now - window_seconds,),
+    ).fetchone()
+    oldest_pending = connection.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'pending'").fetchone()[0]
+    workers = connection.execute(
+        "SELECT COUNT(DISTINCT lease_owner) FROM jobs WHERE status = 'leased' AND lease_expires >= ?", (now,)
+    ).fetchone()[0]
+    return {
+        "counts": counts,
+        "expired_leases": expired,
+        "active_workers": workers,
+        "completed_in_window": recent[0],
+        "jobs_per_minute": recent[0] / (window_seconds / 60),
+        "average_job_seconds": recent[1] or 0.0,
+        "oldest_pending_seconds": (now - oldest_pending) if oldest_pending else 0.0,
+        "window_seconds": window_seconds,
+    }
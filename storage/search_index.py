@@ -0,0 +1,199 @@
+# This file keeps a full-text search index over saved conversations.
+import argparse
+import os
+import re
+import sqlite3
+
+from config import SEARCH_INDEX_PATH
+from storage.archive import list_archived_conversations, parse_conversation_markdown, read_archived_conversation
+
+
+ASSISTANT_SECTION_FIELDS = {
+    "USER MESSAGE": "user",
+    "VERDICT": "verdict",
+    "FINAL ANSWER": "final_answer",
+    "TRANSCRIPT": "transcript",
+}
+
+
+# This function opens the index database, creating the table on first use.
+def open_search_index(index_path=SEARCH_INDEX_PATH):
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(index_path, timeout=30)
+    connection.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS conversation_index USING fts5(
+            conversation_id UNINDEXED,
+            turn UNINDEXED,
+            field UNINDEXED,
+            content,
+            tokenize = 'porter unicode61'
+        )
+        """
+    )
+    return connection
+
+
+# This function splits a stored assistant reply into its headed sections.
+def split_assistant_sections(content):
+    sections = {}
+    current = None
+    for line in content.splitlines():
+        heading = line.strip()
+        if heading.startswith("## ") and heading[3:] in ("SYSTEM", "VOTES", *ASSISTANT_SECTION_FIELDS):
+            current = heading[3:]
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items()}
+
+
+# This function turns a conversation into (turn, field, text) rows to index.
+def build_index_rows(conversation):
+    rows = []
+    turn = 0
+    for message in conversation:
+        role = message.get("role")
+        content = message.get("content", "") or ""
+        if role == "user":
+            turn += 1
+            rows.append((turn, "user", content))
+        elif role == "assistant":
+            sections = split_assistant_sections(content)
+            if not sections:
+                rows.append((turn, "assistant", content))
+                continue
+            for section_name, field in ASSISTANT_SECTION_FIELDS.items():
+                # The user message is already indexed from the user turn.
+                if field != "user" and sections.get(section_name):
+                    rows.append((turn, field, sections[section_name]))
+    return [row for row in rows if row[2].strip()]
+
+
+# This function replaces a conversation's rows in the index.
+def index_conversation(conversation, conversation_id, index_path=SEARCH_INDEX_PATH):
+    """Re-index conversation_id so searches reflect its latest saved contents."""
+    try:
+        connection = open_search_index(index_path)
+        with connection:
+            connection.execute("DELETE FROM conversation_index WHERE conversation_id = ?", (str(conversation_id),))
+            connection.executemany(
+                "INSERT INTO conversation_index (conversation_id, turn, field, content) VALUES (?, ?, ?, ?)",
+                [(str(conversation_id), turn, field, text) for turn, field, text in build_index_rows(conversation)],
+            )
+        connection.close()
+    except sqlite3.Error as e:
+        print(f"Error updating search index: {e}")
+
+
+# This function turns free text into a safe full-text query.
+def build_match_query(query):
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"' for term in terms)
+
+
+# This function finds saved conversations matching a query.
+def search_conversations(query, limit=10, index_path=SEARCH_INDEX_PATH):
+    """Return up to limit dicts with conversation_id, turn, field, and a highlighted snippet, best match first."""
+    match_query = build_match_query(query)
+    if not match_query:
+        return []
+    connection = open_search_index(index_path)
+    try:
+        rows = connection.execute(
+            """
+            SELECT conversation_id, turn, field, snippet(conversation_index, 3, '[', ']', '…', 16)
+            FROM conversation_index
+            WHERE conversation_index MATCH ?
+            ORDER BY rank
+            """,
+            (match_query,),
+        )
+        results = []
+        seen_ids = set()
+        for conversation_id, turn, field, snippet in rows:
+            if conversation_id in seen_ids:
+                continue
+            seen_ids.add(conversation_id)
+            results.append({"conversation_id": conversation_id, "turn": turn, "field": field, "snippet": snippet})
+            if len(results) >= limit:
+                break
+        return results
+    finally:
+        connection.close()
+
+
+# This function empties the index.
+def clear_search_index(index_path=SEARCH_INDEX_PATH):
+    try:
+        connection = open_search_index(index_path)
+        with connection:
+            connection.execute("DELETE FROM conversation_index")
+        connection.close()
+    except sqlite3.Error as e:
+        print(f"Error clearing search index: {e}")
+
+
+# This function rebuilds the whole index from the saved markdown files and archives.
+def rebuild_search_index(
+    directory="conversations", archive_directory="conversations_archive", index_path=SEARCH_INDEX_PATH
+):
+    """Drop every row and re-index each numbered conversations/<id>.md file.
+
+    Archived conversations without a markdown copy are indexed from the archive. Returns the count indexed.
+    """
+    clear_search_index(index_path)
+    markdown_ids = set()
+    if os.path.isdir(directory):
+        for file_name in os.listdir(directory):
+            conversation_id, extension = os.path.splitext(file_name)
+            if extension == ".md" and conversation_id.isdigit():
+                markdown_ids.add(conversation_id)
+
+    indexed = 0
+    for conversation_id in sorted(markdown_ids, key=int):
+        try:
+            conversation = parse_conversation_markdown(os.path.join(directory, f"{conversation_id}.md"))
+        except IOError as e:
+            print(f"Error reading conversation {conversation_id}: {e}")
+            continue
+        index_conversation(conversation, conversation_id, index_path)
+        indexed += 1
+    for conversation_id in list_archived_conversations(archive_directory):
+        if conversation_id in markdown_ids:
+            continue
+        try:
+            conversation = read_archived_conversation(conversation_id, archive_directory)
+        except (IOError, ValueError) as e:
+            print(f"Error reading archived conversation {conversation_id}: {e}")
+            continue
+        index_conversation(conversation, conversation_id, index_path)
+        indexed += 1
+    return indexed
+
+
+# This function prints search results in a compact list.
+def print_search_results(results):
+    if not results:
+        print("No matching conversations.")
+        return
+    for result in results:
+        snippet = " ".join(result["snippet"].split())
+        print(f"#{result['conversation_id']} (turn {result['turn']}, {result['field']}): {snippet}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search saved conversations.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    search_parser = subcommands.add_parser("search", help="Search the index.")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=10)
+    subcommands.add_parser("rebuild", help="Rebuild the index from conversations/ and archives.")
+    arguments = parser.parse_args()
+
+    if arguments.command == "rebuild":
+        print(f"Indexed {rebuild_search_index()} conversation(s)")
+    else:
+        print_search_results(search_conversations(arguments.query, arguments.limit))
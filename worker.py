@@ -0,0 +1,281 @@
+# This file runs debates from the shared job queue across several worker processes.
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import (
+    BATCH_BACKEND,
+    BATCH_POLL_SECONDS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_PATH,
+    WORKER_CONCURRENCY,
+    WORKER_POLL_SECONDS,
+    WORKER_PROCESSES,
+)
+from services.openai_client import Colors
+from storage.checkpoints import JOB_SESSION_PREFIX
+from storage.files import load_system_prompt
+from storage.job_queue import (
+    claim_job,
+    complete_job,
+    enqueue_jobs,
+    extend_lease,
+    extend_worker_leases,
+    fail_job,
+    get_job,
+    get_queue_status,
+    get_queue_token,
+    open_job_queue,
+)
+from workflow.batch import run_batch_sessions
+from workflow.router import run_routed_session
+
+
+# This function names the debate session for a job, unique across queue files.
+def job_session_id(queue_token, job):
+    return f"{JOB_SESSION_PREFIX}{queue_token}-{job['id']}"
+
+
+# This function runs one queued job through the debate, resuming any stages a crashed attempt finished.
+def run_job(job, queue_token):
+    return run_routed_session(job["prompt"], job["system_prompt"], session_id=job_session_id(queue_token, job))
+
+
+# This function keeps one worker process busy until told to stop.
+def run_worker(queue_path, worker_id, concurrency, lease_seconds, max_attempts, poll_seconds, exit_when_empty):
+    """Claim jobs and run up to `concurrency` debates at once, renewing leases while they run."""
+    connection = open_job_queue(queue_path)
+    queue_token = get_queue_token(connection)
+    in_flight = {}
+    renew_interval = max(lease_seconds / 3, 1)
+    last_renewal = time.time()
+    print(f"{Colors.BLUE}Worker {worker_id} started ({concurrency} concurrent){Colors.RESET}")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            while len(in_flight) < concurrency:
+                job = claim_job(connection, worker_id, lease_seconds, max_attempts)
+                if job is None:
+                    break
+                print(f"{Colors.BLUE}Worker {worker_id} claimed job {job['id']} (attempt {job['attempts']}){Colors.RESET}")
+                in_flight[executor.submit(run_job, job, queue_token)] = job
+
+            if not in_flight:
+                if exit_when_empty:
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            done, _ = wait(list(in_flight), timeout=poll_seconds, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:
+                    fail_job(connection, job["id"], worker_id, error, max_attempts)
+                    print(f"{Colors.RED}Worker {worker_id} job {job['id']} error: {error}{Colors.RESET}")
+                    continue
+                if complete_job(connection, job["id"], worker_id, result):
+                    print(f"{Colors.GREEN}Worker {worker_id} finished job {job['id']}{Colors.RESET}")
+                else:
+                    print(f"{Colors.YELLOW}Worker {worker_id} lost the lease on job {job['id']}{Colors.RESET}")
+
+            if time.time() - last_renewal >= renew_interval:
+                for job in in_flight.values():
+                    extend_lease(connection, job["id"], worker_id, lease_seconds)
+                last_renewal = time.time()
+
+    connection.close()
+
+
+# This function starts several worker processes and waits for them.
+def run_worker_pool(queue_path, processes, concurrency, lease_seconds, max_attempts, poll_seconds, exit_when_empty):
+    host = socket.gethostname()
+    workers = []
+    for index in range(processes):
+        worker_id = f"{host}:{os.getpid()}:{index}"
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(queue_path, worker_id, concurrency, lease_seconds, max_attempts, poll_seconds, exit_when_empty),
+        )
+        process.start()
+        workers.append(process)
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        print(f"{Colors.YELLOW}Stopping workers; unfinished jobs return to the queue when their leases expire.{Colors.RESET}")
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
+
+
+# This function claims queued jobs and runs them together through the batch endpoint.
+def run_batch_worker(queue_path, limit, lease_seconds, max_attempts, backend, poll_seconds):
+    """Lease up to limit pending jobs (all of them when limit is 0) and debate them as one staged batch run.
+
+    Leases are renewed together, in one statement, while sessions replay, while batches upload, and
+    while each batch is waiting. Sessions use the same ids as run_job, so a
+    batch run that dies can be finished by a regular worker or by another batch run.
+    """
+    connection = open_job_queue(queue_path)
+    queue_token = get_queue_token(connection)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:batch"
+    jobs = {}
+    while not limit or len(jobs) < limit:
+        job = claim_job(connection, worker_id, lease_seconds, max_attempts)
+        if job is None:
+            break
+        jobs[job_session_id(queue_token, job)] = job
+    if not jobs:
+        print(f"{Colors.YELLOW}No pending jobs.{Colors.RESET}")
+        connection.close()
+        return
+    print(f"{Colors.BLUE}Batch worker claimed {len(jobs)} job(s) ({backend} backend){Colors.RESET}")
+
+    # Claiming many jobs takes a while, so the earliest leases are brought level before starting.
+    extend_worker_leases(connection, worker_id, lease_seconds)
+    last_renewed = time.monotonic()
+
+    # Called often (once per replayed session), so it only writes once a third of the lease has passed.
+    def renew_leases():
+        nonlocal last_renewed
+        if time.monotonic() - last_renewed < lease_seconds / 3:
+            return
+        extend_worker_leases(connection, worker_id, lease_seconds)
+        last_renewed = time.monotonic()
+
+    def finish_job(session_id, result):
+        job = jobs.pop(session_id)
+        if complete_job(connection, job["id"], worker_id, result):
+            print(f"{Colors.GREEN}Batch worker finished job {job['id']}{Colors.RESET}")
+        else:
+            print(f"{Colors.YELLOW}Batch worker lost the lease on job {job['id']}{Colors.RESET}")
+
+    def fail_session(session_id, error):
+        job = jobs.pop(session_id)
+        fail_job(connection, job["id"], worker_id, error, max_attempts)
+
+    sessions = [
+        {"session_id": session_id, "user_prompt": job["prompt"], "base_system": job["system_prompt"]}
+        for session_id, job in jobs.items()
+    ]
+    run_batch_sessions(
+        sessions,
+        backend=backend,
+        poll_seconds=poll_seconds,
+        on_result=finish_job,
+        on_error=fail_session,
+        on_poll=renew_leases,
+    )
+    connection.close()
+
+
+# This function prints queue depth and throughput.
+def print_queue_status(queue_path):
+    connection = open_job_queue(queue_path)
+    status = get_queue_status(connection)
+    connection.close()
+    counts = status["counts"]
+    print(
+        f"Pending: {counts['pending']} | Leased: {counts['leased']} "
+        f"(expired: {status['expired_leases']}) | Done: {counts['done']} | Failed: {counts['failed']}"
+    )
+    print(f"Active workers: {status['active_workers']}")
+    print(
+        f"Throughput (last {int(status['window_seconds'] // 60)} min): {status['jobs_per_minute']:.2f} jobs/min, "
+        f"avg {status['average_job_seconds']:.1f}s per job"
+    )
+    print(f"Oldest pending job: {status['oldest_pending_seconds']:.0f}s old")
+
+
+# This function reads prompts from the command line or a file.
+def collect_prompts(arguments):
+    prompts = list(arguments.prompts)
+    if arguments.file:
+        with open(arguments.file, "r", encoding="utf-8") as f:
+            prompts.extend(line.strip() for line in f if line.strip())
+    return prompts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run debates from a shared local job queue.")
+    parser.add_argument("--queue", default=JOB_QUEUE_PATH, help="Path to the SQLite queue file.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subcommands.add_parser("enqueue", help="Add prompts to the queue.")
+    enqueue_parser.add_argument("prompts", nargs="*", help="Prompts to enqueue.")
+    enqueue_parser.add_argument("--file", help="Text file with one prompt per line.")
+    enqueue_parser.add_argument("--system", default="SYSTEM.md", help="System prompt file applied to every job.")
+
+    work_parser = subcommands.add_parser("work", help="Start worker processes.")
+    work_parser.add_argument("--processes", type=int, default=WORKER_PROCESSES)
+    work_parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Debates per process.")
+    work_parser.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="Lease length in seconds.")
+    work_parser.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS)
+    work_parser.add_argument("--poll", type=float, default=WORKER_POLL_SECONDS, help="Idle poll interval in seconds.")
+    work_parser.add_argument("--exit-when-empty", action="store_true", help="Stop once no jobs are left.")
+
+    batch_parser = subcommands.add_parser("batch", help="Run pending jobs through the provider's batch endpoint.")
+    batch_parser.add_argument("--limit", type=int, default=0, help="Most jobs to claim (0 claims every pending job).")
+    batch_parser.add_argument("--backend", choices=("openai", "local"), default=BATCH_BACKEND)
+    batch_parser.add_argument("--poll", type=float, default=BATCH_POLL_SECONDS, help="Batch poll interval in seconds.")
+    batch_parser.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="Lease length in seconds.")
+    batch_parser.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS)
+
+    subcommands.add_parser("status", help="Show queue depth and throughput.")
+
+    show_parser = subcommands.add_parser("show", help="Print a job's final answer.")
+    show_parser.add_argument("job_id", type=int)
+
+    arguments = parser.parse_args()
+
+    if arguments.command == "enqueue":
+        prompts = collect_prompts(arguments)
+        if not prompts:
+            print(f"{Colors.YELLOW}No prompts provided.{Colors.RESET}")
+            return
+        connection = open_job_queue(arguments.queue)
+        job_ids = enqueue_jobs(connection, prompts, load_system_prompt(arguments.system))
+        connection.close()
+        print(f"Enqueued {len(job_ids)} job(s): {job_ids[0]}-{job_ids[-1]}")
+    elif arguments.command == "work":
+        run_worker_pool(
+            arguments.queue,
+            arguments.processes,
+            arguments.concurrency,
+            arguments.lease,
+            arguments.max_attempts,
+            arguments.poll,
+            arguments.exit_when_empty,
+        )
+    elif arguments.command == "batch":
+        run_batch_worker(
+            arguments.queue,
+            arguments.limit,
+            arguments.lease,
+            arguments.max_attempts,
+            arguments.backend,
+            arguments.poll,
+        )
+    elif arguments.command == "status":
+        print_queue_status(arguments.queue)
+    elif arguments.command == "show":
+        connection = open_job_queue(arguments.queue)
+        job = get_job(connection, arguments.job_id)
+        connection.close()
+        if job is None:
+            print(f"{Colors.YELLOW}No job {arguments.job_id}.{Colors.RESET}")
+        elif job["status"] != "done":
+            print(f"Job {job['id']} is {job['status']}" + (f": {job['error']}" if job["error"] else ""))
+        else:
+            print(job["result"].get("final_answer") or job["result"].get("verdict", ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# This file runs many debates together through a batch endpoint, one stage at a time.
+import json
+import os
+
+from config import (
+    ANALYTICS_EXPORT_ENABLED,
+    BATCH_BACKEND,
+    BATCH_DIRECTORY,
+    BATCH_MAX_REQUESTS,
+    BATCH_POLL_SECONDS,
+)
+from services.batch_client import download_batch_results, submit_batch, wait_for_batch
+from services.openai_client import BatchCollection, BatchRequestPending, Colors
+from storage.analytics import export_debate_result
+from workflow.debate import run_debate_session
+
+
+# This function loads every batch result saved by earlier stages or runs.
+def load_batch_responses(directory=BATCH_DIRECTORY):
+    responses = {}
+    file_path = os.path.join(directory, "responses.jsonl")
+    if not os.path.isfile(file_path):
+        return responses
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line torn by a crash mid-write is skipped; that request is simply asked again.
+                continue
+            responses[record["custom_id"]] = record["body"]
+    return responses
+
+
+# This function appends successful batch results to the on-disk cache.
+def save_batch_responses(results, directory=BATCH_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "responses.jsonl"), "a", encoding="utf-8") as f:
+        for custom_id, body in results.items():
+            # Failures are left out so a later run asks for them again.
+            if body:
+                f.write(json.dumps({"custom_id": custom_id, "body": body}, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# This function rewrites the on-disk cache with only the given results.
+def rewrite_batch_responses(responses, directory=BATCH_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, "responses.jsonl")
+    with open(f"{file_path}.tmp", "w", encoding="utf-8") as f:
+        for custom_id, body in responses.items():
+            if body:
+                f.write(json.dumps({"custom_id": custom_id, "body": body}, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{file_path}.tmp", file_path)
+
+
+# This function loads the batches submitted but not yet collected, keyed by batch id.
+def load_open_batches(directory=BATCH_DIRECTORY):
+    file_path = os.path.join(directory, "open_batches.json")
+    if not os.path.isfile(file_path):
+        return {}
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError) as e:
+        print(f"Error reading {file_path}: {e}")
+        return {}
+
+
+# This function records which batches are in flight so a restarted run waits for them instead of resubmitting.
+def save_open_batches(open_batches, directory=BATCH_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, "open_batches.json")
+    with open(f"{file_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(open_batches, f)
+    os.replace(f"{file_path}.tmp", file_path)
+
+
+# This function waits for one batch and merges its results into responses.
+def collect_batch(batch_id, custom_ids, responses, backend, directory, poll_seconds, on_poll=None):
+    status = wait_for_batch(batch_id, backend, directory, poll_seconds, on_poll)
+    results = download_batch_results(batch_id, backend, directory)
+    if status != "completed":
+        answered = f"{len(results)} of {len(custom_ids)} answered"
+        print(f"{Colors.YELLOW}Batch {batch_id} ended as {status}; {answered}{Colors.RESET}")
+    save_batch_responses(results, directory)
+    # Requests the batch never answered count as failed for this run, the same as a failed live call.
+    for custom_id in custom_ids:
+        results.setdefault(custom_id, None)
+    responses.update(results)
+
+
+# This function replays every unfinished debate as far as the known results reach.
+def advance_sessions(sessions, responses, max_rounds, on_poll=None):
+    """Return (finished results, errors, requests still needed, cached replies used).
+
+    Requests still needed are keyed by custom id; the rest by session id, with the replies used
+    given as the custom ids each session read from responses during this pass.
+    """
+    finished = {}
+    errors = {}
+    pending = {}
+    answered = {}
+    for session in sessions:
+        if on_poll is not None:
+            on_poll()
+        session_id = session["session_id"]
+        with BatchCollection(responses, session_id) as collection:
+            try:
+                finished[session_id] = run_debate_session(
+                    session["user_prompt"], session["base_system"], max_rounds=max_rounds, session_id=session_id
+                )
+            except BatchRequestPending:
+                pass
+            except Exception as error:
+                errors[session_id] = error
+        pending.update(collection.pending)
+        answered[session_id] = collection.answered
+    return finished, errors, pending, answered
+
+
+# This function runs a set of debates through the batch endpoint, stage by stage.
+def run_batch_sessions(
+    sessions,
+    max_rounds=None,
+    backend=BATCH_BACKEND,
+    directory=BATCH_DIRECTORY,
+    poll_seconds=BATCH_POLL_SECONDS,
+    on_result=None,
+    on_error=None,
+    on_poll=None,
+):
+    """Run sessions (dicts with session_id, user_prompt, base_system) and return {session_id: result}.
+
+    Each pass replays every unfinished debate from its checkpoint log and the batch results so far,
+    which stops each one at the first stage still missing replies. Those requests, across all
+    sessions, become the next batch. Round 1 for every session goes out together, then round 2,
+    and so on through the judge, consensus, and writer. on_result(session_id, result) and
+    on_error(session_id, error) fire as sessions finish; on_poll() fires before each session replay
+    and batch upload and while a batch is waiting, so callers can keep leases alive.
+    """
+    responses = load_batch_responses(directory)
+    open_batches = load_open_batches(directory)
+    for batch_id, custom_ids in list(open_batches.items()):
+        print(f"{Colors.BLUE}Waiting for batch {batch_id} submitted before the restart{Colors.RESET}")
+        collect_batch(batch_id, custom_ids, responses, backend, directory, poll_seconds, on_poll)
+        del open_batches[batch_id]
+        save_open_batches(open_batches, directory)
+
+    results = {}
+    used_ids = {}
+    remaining = list(sessions)
+    stage = 0
+    while remaining:
+        finished, errors, pending, answered = advance_sessions(remaining, responses, max_rounds, on_poll)
+        # Stages already in a checkpoint log replay from it, so each pass only reads the newest replies.
+        for session_id, custom_ids in answered.items():
+            used_ids.setdefault(session_id, set()).update(custom_ids)
+        for session_id, result in finished.items():
+            result["tier"] = "batch"
+            if ANALYTICS_EXPORT_ENABLED:
+                export_debate_result(result)
+            if on_result is not None:
+                on_result(session_id, result)
+        for session_id, error in errors.items():
+            print(f"{Colors.RED}Batch session {session_id} error: {error}{Colors.RESET}")
+            if on_error is not None:
+                on_error(session_id, error)
+        results.update(finished)
+        settled = set(finished) | set(errors)
+        # A settled session never asks for its replies again, so they are dropped to keep the
+        # cache from growing with every run.
+        settled_ids = set().union(*(used_ids.pop(session_id, set()) for session_id in settled))
+        if settled_ids & responses.keys():
+            for custom_id in settled_ids:
+                responses.pop(custom_id, None)
+            rewrite_batch_responses(responses, directory)
+        remaining = [session for session in remaining if session["session_id"] not in settled]
+        if not pending:
+            break
+
+        stage += 1
+        summary = f"{len(pending)} request(s) from {len(remaining)} debate(s)"
+        print(f"{Colors.BLUE}Batch stage {stage}: {summary}{Colors.RESET}")
+        custom_ids = list(pending)
+        for start in range(0, len(custom_ids), BATCH_MAX_REQUESTS):
+            if on_poll is not None:
+                on_poll()
+            chunk = custom_ids[start : start + BATCH_MAX_REQUESTS]
+            batch_id = submit_batch({custom_id: pending[custom_id] for custom_id in chunk}, backend, directory)
+            open_batches[batch_id] = chunk
+            save_open_batches(open_batches, directory)
+        for batch_id, chunk in list(open_batches.items()):
+            collect_batch(batch_id, chunk, responses, backend, directory, poll_seconds, on_poll)
+            del open_batches[batch_id]
+            save_open_batches(open_batches, directory)
+    return results
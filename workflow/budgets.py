@@ -0,0 +1,101 @@
+# This file sets how long each role may answer and tracks replies that run long.
+import threading
+import time
+
+from config import (
+    BUDGET_MIN_SCALE,
+    BUDGET_TIGHTEN_AFTER,
+    DEBATE_LATENCY_TARGET_SECONDS,
+    REASONING_MODEL_PREFIXES,
+    REASONING_TOKEN_ALLOWANCE,
+    ROLE_OUTPUT_BUDGETS,
+)
+from services.openai_client import OUTPUT_STATS, OUTPUT_STATS_LOCK, batch_collection_active
+
+
+OVERRUN_LOCK = threading.Lock()
+OVERRUN_STATS = {}
+MIN_OUTPUT_TOKENS = 64
+
+
+# This function works out how much to shrink budgets as a debate nears its latency target.
+def budget_scale(session_started):
+    """Return a multiplier in [BUDGET_MIN_SCALE, 1.0] based on how much of the latency target is used.
+
+    Batched debates have no latency target, and their requests must stay identical between replays.
+    """
+    if session_started is None or DEBATE_LATENCY_TARGET_SECONDS <= 0 or batch_collection_active():
+        return 1.0
+    used = (time.perf_counter() - session_started) / DEBATE_LATENCY_TARGET_SECONDS
+    if used <= BUDGET_TIGHTEN_AFTER:
+        return 1.0
+    if used >= 1.0 or BUDGET_TIGHTEN_AFTER >= 1.0:
+        return BUDGET_MIN_SCALE
+    progress = (used - BUDGET_TIGHTEN_AFTER) / (1.0 - BUDGET_TIGHTEN_AFTER)
+    return 1.0 - progress * (1.0 - BUDGET_MIN_SCALE)
+
+
+# This function checks whether a model accepts a reasoning effort setting.
+def is_reasoning_model(model_id):
+    return isinstance(model_id, str) and model_id.startswith(REASONING_MODEL_PREFIXES)
+
+
+# This function builds the request overrides for one role's call.
+def build_role_overrides(role, model_id, session_started=None):
+    """Return generate_chat_response overrides with the role's output budget, tightened near the latency target."""
+    budget = ROLE_OUTPUT_BUDGETS.get(role, {})
+    overrides = {"model": model_id}
+    scale = budget_scale(session_started)
+    max_tokens = budget.get("max_tokens")
+    reasoning_model = is_reasoning_model(model_id)
+    if max_tokens:
+        max_completion_tokens = max(int(max_tokens * scale), MIN_OUTPUT_TOKENS)
+        if reasoning_model:
+            # Hidden reasoning counts against the same cap; without headroom it can use it all up
+            # and leave an empty reply. Tightening lowers reasoning_effort instead.
+            max_completion_tokens += REASONING_TOKEN_ALLOWANCE
+        overrides["max_completion_tokens"] = max_completion_tokens
+    reasoning_effort = budget.get("reasoning_effort")
+    if reasoning_effort and reasoning_model:
+        overrides["reasoning_effort"] = "low" if scale < 1.0 else reasoning_effort
+    return overrides
+
+
+# This function pulls the model name out of a model id or override dict.
+def resolve_model_name(model_overrides):
+    if isinstance(model_overrides, dict):
+        return model_overrides.get("model")
+    return model_overrides
+
+
+# This function notes when a reply ran past the word limit its prompt asked for.
+def record_word_overrun(model_id, text, word_limit):
+    word_count = len((text or "").split())
+    with OVERRUN_LOCK:
+        stats = OVERRUN_STATS.setdefault(resolve_model_name(model_id), {"checked": 0, "overruns": 0})
+        stats["checked"] += 1
+        if word_count > word_limit:
+            stats["overruns"] += 1
+
+
+# This function reports truncations and overruns for every model.
+def format_output_budget_report():
+    with OUTPUT_STATS_LOCK:
+        output_stats = {model: dict(values) for model, values in OUTPUT_STATS.items()}
+    with OVERRUN_LOCK:
+        overrun_stats = {model: dict(values) for model, values in OVERRUN_STATS.items()}
+    models = sorted(set(output_stats) | set(overrun_stats), key=str)
+    if not models:
+        return "Output budgets: no calls yet"
+    lines = ["Output budgets (per model):"]
+    for model in models:
+        calls = output_stats.get(model, {})
+        overruns = overrun_stats.get(model, {})
+        call_count = calls.get("calls", 0)
+        average_tokens = calls.get("completion_tokens", 0) / call_count if call_count else 0.0
+        lines.append(
+            f"- {model}: {call_count} calls, {calls.get('truncated', 0)} truncated, "
+            f"{overruns.get('overruns', 0)}/{overruns.get('checked', 0)} over word limit, "
+            f"avg {average_tokens:.0f} output tokens"
+        )
+    return "\n".join(lines)
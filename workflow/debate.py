@@ -1,17 +1,48 @@
 # This file runs the debate conversation from start to finish.
 import json
-
-from config import DEBATE_MODELS, JUDGE_LABEL, JUDGE_MODEL, MAX_DEBATE_ROUNDS, WRITER_MODEL
-from services.openai_client import Colors, generate_chat_response
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    CHECKPOINT_DIRECTORY,
+    CHECKPOINTS_ENABLED,
+    CONSENSUS_COMMENT_WORD_LIMIT,
+    CONSENSUS_POLICY,
+    DEBATE_MODELS,
+    DEBATER_INITIAL_WORD_LIMIT,
+    DEBATER_UPDATE_WORD_LIMIT,
+    JUDGE_INPUT_MODE,
+    JUDGE_INPUT_TOKEN_BUDGET,
+    JUDGE_LABEL,
+    JUDGE_MODEL,
+    MAX_DEBATE_ROUNDS,
+    SPECULATIVE_WRITER,
+    WRITER_LABEL,
+    WRITER_MODEL,
+)
+from services.openai_client import BatchRequestPending, Colors, batch_collection_active, generate_chat_response
+from services.tracing import carry_trace_context, trace_session, trace_span
+from storage.checkpoints import (
+    finish_checkpoint,
+    get_checkpoint_stage,
+    new_session_id,
+    open_checkpoint,
+    save_checkpoint_stage,
+)
+from workflow.budgets import build_role_overrides, record_word_overrun, resolve_model_name
+from workflow.judge_input import build_judge_transcript, estimate_token_count
 from workflow.prompts import (
     build_consensus_prompt,
     build_debater_system_prompt,
     build_final_answer_request,
     build_final_answer_system_prompt,
     build_initial_debate_message,
+    build_judge_delta_request,
     build_judge_request,
     build_judge_system_prompt,
     build_round_update_message,
+    build_speculative_answer_request,
 )
 
 
@@ -25,6 +56,13 @@ INVALID_CONSENSUS_RESPONSE_MESSAGE = (
     '"agreement" ("agree" or "disagree") and optional "comment".'
 )
 
+class StageFailedError(RuntimeError):
+    """Raised when a stage got no reply; the checkpoint log is kept so the debate can resume there."""
+
+
+SPECULATION_LOCK = threading.Lock()
+SPECULATION_STATS = {"attempts": 0, "hits": 0, "misses": 0, "saved_seconds": 0.0}
+
 
 # This function removes code block wrappers from text.
 def strip_code_fences(text):
@@ -212,115 +250,191 @@ def display_round_status(round_label, model_label, reply):
     print(f"{Colors.CYAN}Round {round_label} - {model_label} ({stance_display}){notes_display}{Colors.RESET}")
 
 
-def request_debater_reply(history, model_id):
+def request_debater_reply(history, model_overrides):
     """Fetch a debater reply, allowing a single retry if the JSON is invalid."""
-    attempts = 0
-    reply = None
-    while attempts < 2:
-        raw_response = generate_chat_response(history, model_id)
-        reply = normalize_debater_reply(raw_response)
-        history.append({"role": "assistant", "content": raw_response})
-        if reply["valid"]:
-            break
-        attempts += 1
-        if attempts < 2:
-            history.append({"role": "user", "content": INVALID_DEBATER_RESPONSE_MESSAGE})
-    return reply
+    with trace_span("debater reply", "call", model=resolve_model_name(model_overrides)):
+        return request_validated_reply(
+            history, model_overrides, normalize_debater_reply, INVALID_DEBATER_RESPONSE_MESSAGE
+        )
 
 
-def request_consensus_reply(history, model_id):
+def request_consensus_reply(history, model_overrides):
     """Fetch a consensus reply, allowing a single retry if the JSON is invalid."""
+    with trace_span("consensus reply", "call", model=resolve_model_name(model_overrides)):
+        return request_validated_reply(
+            history, model_overrides, normalize_consensus_reply, INVALID_CONSENSUS_RESPONSE_MESSAGE
+        )
+
+
+# This function keeps asking until the reply parses, giving up after two tries.
+def request_validated_reply(history, model_overrides, normalize_reply, invalid_message):
     attempts = 0
     reply = None
     while attempts < 2:
-        raw_response = generate_chat_response(history, model_id)
-        reply = normalize_consensus_reply(raw_response)
+        with trace_span(f"attempt {attempts + 1}", "attempt", model=resolve_model_name(model_overrides)):
+            raw_response = generate_chat_response(history, model_overrides)
+        reply = normalize_reply(raw_response)
         history.append({"role": "assistant", "content": raw_response})
         if reply["valid"]:
             break
         attempts += 1
         if attempts < 2:
-            history.append({"role": "user", "content": INVALID_CONSENSUS_RESPONSE_MESSAGE})
+            history.append({"role": "user", "content": invalid_message})
+    reply["attempts"] = min(attempts + 1, 2)
     return reply
 
 
-# This function runs the entire debate cycle and bundles the results.
-def run_debate_session(user_prompt, base_system):
-    """Execute the multi-model debate workflow and return a structured result."""
-    debate_state = {}
-    transcript = []
-    active_models = set()
-
-    print(f"{Colors.GREEN}Commencing Debate!{Colors.RESET}")
-
-    # Round 1 – initial answers
-    for participant in DEBATE_MODELS:
-        label = participant["label"]
-        model_id = participant["model"]
-        history = [
-            {"role": "system", "content": build_debater_system_prompt(label, base_system)},
-            {"role": "user", "content": build_initial_debate_message(user_prompt)},
-        ]
-        reply = request_debater_reply(history, model_id)
+def request_checkpointed_reply(checkpoint, stage, history, model_overrides, request_reply):
+    """Replay a logged debater/consensus turn into history, or request it and log the result."""
+    saved = get_checkpoint_stage(checkpoint, stage)
+    if saved is not None:
+        history.extend(saved["messages"])
+        return saved["reply"]
+    first_new_message = len(history)
+    reply = request_reply(history, model_overrides)
+    if not reply["raw"]:
+        raise StageFailedError(f"No reply for stage {stage}")
+    save_checkpoint_stage(checkpoint, stage, {"reply": reply, "messages": history[first_new_message:]})
+    return reply
 
-        debate_state[label] = {
-            "model": model_id,
-            "history": history,
-            "latest": reply,
-            "active": reply["stance"] != "concede",
-        }
 
-        if reply["stance"] != "concede":
-            active_models.add(label)
+# This function stops a batched debate once a stage has queued all of its requests.
+def raise_if_batch_pending(pending_count):
+    """Raise BatchRequestPending after a stage whose independent calls were queued for the next batch.
+
+    Letting every participant in the stage queue its request first puts them all in the same batch.
+    """
+    if pending_count:
+        raise BatchRequestPending(f"{pending_count} request(s) queued")
+
+
+# This function maps a name a debater used (label or model id) back to its label.
+def resolve_debater_label(name, debate_state):
+    if not isinstance(name, str):
+        return None
+    wanted = name.strip().lower()
+    for label, state in debate_state.items():
+        if wanted in {label.lower(), str(state.get("model", "")).lower()}:
+            return label
+    return None
+
+
+# This function skips a consensus call whose answer the debate already settled.
+def infer_consensus_vote(label, latest, debate_state, judge_result, validated_winner):
+    """Return an agreeing vote for label without a model call, or None if it still needs polling.
+
+    Under the "infer" CONSENSUS_POLICY, once the judge approves a winner, that winner and any debater
+    that conceded to it count as agreeing. A rejected or no_winner verdict always polls everyone.
+    """
+    if CONSENSUS_POLICY != "infer" or validated_winner is None:
+        return None
+    if str(judge_result.get("verdict", "")).lower() != "approved":
+        return None
+    if label == validated_winner:
+        comment = "Validated winner"
+    elif (
+        latest.get("stance") == "concede"
+        and resolve_debater_label(latest.get("conceded_to"), debate_state) == validated_winner
+    ):
+        comment = f"Conceded to {validated_winner}"
+    else:
+        return None
+    return {"agreement": "agree", "comment": comment, "raw": "", "valid": True, "inferred": True}
 
-        transcript.append(
-            {
-                "round": 1,
-                "model": label,
-                "stance": "stand" if reply["stance"] != "concede" else "concede",
-                "content": reply["content"],
-                "notes": reply.get("notes"),
-                "conceded_to": reply.get("conceded_to"),
-            }
-        )
 
-        display_round_status(1, label, reply)
+# This function pulls the user-facing answer out of the writer's reply.
+def extract_final_answer_text(final_answer_raw, fallback_text):
+    final_answer_candidate = final_answer_raw.strip()
+    parsed_final_answer = parse_json_response(final_answer_candidate)
+    if not parsed_final_answer and final_answer_candidate.startswith("```"):
+        unfenced_candidate = strip_code_fences(final_answer_candidate).strip()
+        if unfenced_candidate:
+            parsed_final_answer = parse_json_response(unfenced_candidate)
+            if parsed_final_answer:
+                final_answer_candidate = unfenced_candidate
+    if parsed_final_answer:
+        for key in ("answer", "conclusion", "content", "final_answer"):
+            value = parsed_final_answer.get(key)
+            if isinstance(value, str) and value.strip():
+                final_answer_candidate = value.strip()
+                break
+    if not final_answer_candidate:
+        final_answer_candidate = fallback_text
+    return final_answer_candidate.strip()
 
-    round_number = 2
-    while len(active_models) > 1 and round_number <= MAX_DEBATE_ROUNDS:
-        state_summary = build_round_digest(debate_state)
 
-        for name in list(active_models):
-            state = debate_state[name]
-            state["history"].append({"role": "user", "content": build_round_update_message(round_number, state_summary)})
-            reply = request_debater_reply(state["history"], state["model"])
-            state["latest"] = reply
+def request_speculative_answer(user_prompt, base_system, winner_label, winner_statement):
+    """Draft the final answer from the leading debater's statement while the judge is still working."""
+    started = time.perf_counter()
+    history = [
+        {"role": "system", "content": build_final_answer_system_prompt(base_system)},
+        {
+            "role": "user",
+            "content": build_speculative_answer_request(user_prompt, winner_label, winner_statement),
+        },
+    ]
+    with trace_span("speculative writer", "stage", model=WRITER_MODEL, winner=winner_label):
+        draft_raw = generate_chat_response(history, build_role_overrides("writer", WRITER_MODEL))
+    return extract_final_answer_text(draft_raw, ""), time.perf_counter() - started
 
-            if reply["stance"] == "concede":
-                state["active"] = False
-                active_models.discard(name)
-            else:
-                state["active"] = True
-
-            transcript.append(
-                {
-                    "round": round_number,
-                    "model": name,
-                    "stance": reply["stance"],
-                    "content": reply["content"],
-                    "notes": reply.get("notes"),
-                    "conceded_to": reply.get("conceded_to"),
-                }
-            )
 
-            display_round_status(round_number, name, reply)
+def resolve_speculative_answer(speculative_future, judge_result, debate_winner, validated_winner):
+    """Return the speculative draft if the judge approved the debate winner, otherwise None.
 
-        round_number += 1
+    A discarded draft has usually already been requested in full, so every miss costs one extra writer call.
+    """
+    confirmed = (
+        str(judge_result.get("verdict", "")).lower() == "approved"
+        and validated_winner is not None
+        and validated_winner == debate_winner
+    )
+    draft_text = ""
+    saved_seconds = 0.0
+    if confirmed:
+        wait_started = time.perf_counter()
+        try:
+            draft_text, draft_seconds = speculative_future.result()
+            # The draft stands in for a writer call of about the same length; only the part that
+            # finished before the judge did is time saved.
+            saved_seconds = max(draft_seconds - (time.perf_counter() - wait_started), 0.0)
+        except Exception as error:
+            print(f"{Colors.YELLOW}Speculative draft failed: {error}{Colors.RESET}")
+    else:
+        # The draft starts as soon as it is submitted, so cancel() almost never stops it: a miss
+        # still pays for the whole draft call, which finishes in the background and is dropped.
+        speculative_future.cancel()
+
+    with SPECULATION_LOCK:
+        SPECULATION_STATS["attempts"] += 1
+        if confirmed and draft_text:
+            SPECULATION_STATS["hits"] += 1
+            SPECULATION_STATS["saved_seconds"] += saved_seconds
+        else:
+            SPECULATION_STATS["misses"] += 1
+
+    if confirmed and draft_text:
+        print(f"{Colors.MAGENTA}{WRITER_LABEL} speculative draft confirmed{Colors.RESET}")
+        return draft_text
+    print(f"{Colors.MAGENTA}{WRITER_LABEL} speculative draft discarded; rewriting{Colors.RESET}")
+    return None
+
+
+# This function reports how often the speculative writer paid off.
+def format_speculation_report():
+    with SPECULATION_LOCK:
+        stats = dict(SPECULATION_STATS)
+    if not stats["attempts"]:
+        return "Speculative writer: no attempts yet"
+    hit_rate = stats["hits"] / stats["attempts"] * 100
+    return (
+        f"Speculative writer: {stats['hits']}/{stats['attempts']} hits ({hit_rate:.0f}%), "
+        f"{stats['misses']} rewrites (each also paid for a discarded draft), "
+        f"~{stats['saved_seconds']:.1f}s of writer wait saved"
+    )
 
-    winner = None
-    if len(active_models) == 1:
-        winner = next(iter(active_models))
 
+# This function lists where every debater ended up after the rounds.
+def build_final_positions_text(debate_state):
     final_positions_lines = []
     for participant in DEBATE_MODELS:
         label = participant["label"]
@@ -331,19 +445,200 @@ def run_debate_session(user_prompt, base_system):
         if stance_display == "concede" and latest.get("conceded_to"):
             stance_display = f"concede to {latest['conceded_to']}"
         final_positions_lines.append(f"- {label} ({stance_display}): {latest['content']}")
-    final_positions_text = "\n".join(final_positions_lines)
+    return "\n".join(final_positions_lines)
+
+
+def build_judge_input(user_prompt, winner, transcript, debate_state):
+    """Build the judge's user message, sending only round deltas when JUDGE_INPUT_MODE is "delta"."""
+    if JUDGE_INPUT_MODE != "delta":
+        return build_judge_request(
+            user_prompt, winner, format_transcript(transcript), build_final_positions_text(debate_state)
+        )
+    overhead_tokens = estimate_token_count(build_judge_delta_request(user_prompt, winner, ""))
+    transcript_budget = max(JUDGE_INPUT_TOKEN_BUDGET - overhead_tokens, 0)
+    return build_judge_delta_request(user_prompt, winner, build_judge_transcript(transcript, transcript_budget))
+
+
+# This function runs the entire debate cycle and bundles the results.
+def run_debate_session(user_prompt, base_system, max_rounds=None, session_id=None):
+    """Execute the multi-model debate workflow and return a structured result.
+
+    max_rounds caps the number of debate rounds (defaults to MAX_DEBATE_ROUNDS). When
+    checkpoints are enabled every completed stage is logged under session_id, and a
+    session_id with an existing log replays those stages instead of calling the models again.
+    When tracing is enabled the session's spans are written to TRACE_DIRECTORY/<session_id>.json.
+    """
+    if max_rounds is None:
+        max_rounds = MAX_DEBATE_ROUNDS
+    session_id = session_id or new_session_id()
+    with trace_session(session_id, max_rounds=max_rounds):
+        return run_debate_stages(user_prompt, base_system, max_rounds, session_id)
+
+
+# This function does the actual debate work for run_debate_session.
+def run_debate_stages(user_prompt, base_system, max_rounds, session_id):
+    session_started = time.perf_counter()
+    checkpoint = None
+    if CHECKPOINTS_ENABLED:
+        checkpoint = open_checkpoint(session_id, CHECKPOINT_DIRECTORY)
+        header = get_checkpoint_stage(checkpoint, "session")
+        if header is None:
+            save_checkpoint_stage(
+                checkpoint,
+                "session",
+                {"user_prompt": user_prompt, "base_system": base_system, "max_rounds": max_rounds},
+            )
+        elif (header.get("user_prompt"), header.get("base_system")) != (user_prompt, base_system):
+            # Replaying another prompt's stages would store that debate as this one's answer.
+            raise ValueError(f"Checkpoint {session_id} was logged for a different prompt; not resuming it")
+        elif len(checkpoint["stages"]) > 1:
+            print(f"{Colors.YELLOW}Resuming debate {session_id} from {len(checkpoint['stages']) - 1} saved stage(s){Colors.RESET}")
+    debate_state = {}
+    transcript = []
+    active_models = set()
+
+    print(f"{Colors.GREEN}Commencing Debate!{Colors.RESET}")
+
+    with trace_span("debate rounds", "stage"):
+        # Round 1 – initial answers
+        with trace_span("round 1", "round"):
+            pending_count = 0
+            for participant in DEBATE_MODELS:
+                label = participant["label"]
+                model_id = participant["model"]
+                history = [
+                    {"role": "system", "content": build_debater_system_prompt(label, base_system)},
+                    {"role": "user", "content": build_initial_debate_message(user_prompt)},
+                ]
+                try:
+                    reply = request_checkpointed_reply(
+                        checkpoint,
+                        f"round-1:{label}",
+                        history,
+                        build_role_overrides("debater", model_id, session_started),
+                        request_debater_reply,
+                    )
+                except BatchRequestPending:
+                    pending_count += 1
+                    continue
+                record_word_overrun(model_id, reply["content"], DEBATER_INITIAL_WORD_LIMIT)
+
+                debate_state[label] = {
+                    "model": model_id,
+                    "history": history,
+                    "latest": reply,
+                    "active": reply["stance"] != "concede",
+                }
+
+                if reply["stance"] != "concede":
+                    active_models.add(label)
+
+                transcript.append(
+                    {
+                        "round": 1,
+                        "model": label,
+                        "model_id": model_id,
+                        "stance": "stand" if reply["stance"] != "concede" else "concede",
+                        "content": reply["content"],
+                        "notes": reply.get("notes"),
+                        "conceded_to": reply.get("conceded_to"),
+                        "valid": reply["valid"],
+                        "attempts": reply.get("attempts", 1),
+                    }
+                )
+
+                display_round_status(1, label, reply)
+            raise_if_batch_pending(pending_count)
+
+        round_number = 2
+        while len(active_models) > 1 and round_number <= max_rounds:
+            with trace_span(f"round {round_number}", "round"):
+                state_summary = build_round_digest(debate_state)
+
+                pending_count = 0
+                # Seating order, not set order: the transcript (and so the judge's request) must not
+                # depend on PYTHONHASHSEED, or a replayed batch run could not match its cached replies.
+                round_order = [participant["label"] for participant in DEBATE_MODELS]
+                for name in [label for label in round_order if label in active_models]:
+                    state = debate_state[name]
+                    update_message = build_round_update_message(round_number, state_summary)
+                    state["history"].append({"role": "user", "content": update_message})
+                    try:
+                        reply = request_checkpointed_reply(
+                            checkpoint,
+                            f"round-{round_number}:{name}",
+                            state["history"],
+                            build_role_overrides("debater", state["model"], session_started),
+                            request_debater_reply,
+                        )
+                    except BatchRequestPending:
+                        pending_count += 1
+                        continue
+                    record_word_overrun(state["model"], reply["content"], DEBATER_UPDATE_WORD_LIMIT)
+                    state["latest"] = reply
+
+                    if reply["stance"] == "concede":
+                        state["active"] = False
+                        active_models.discard(name)
+                    else:
+                        state["active"] = True
+
+                    transcript.append(
+                        {
+                            "round": round_number,
+                            "model": name,
+                            "model_id": state["model"],
+                            "stance": reply["stance"],
+                            "content": reply["content"],
+                            "notes": reply.get("notes"),
+                            "conceded_to": reply.get("conceded_to"),
+                            "valid": reply["valid"],
+                            "attempts": reply.get("attempts", 1),
+                        }
+                    )
+
+                    display_round_status(round_number, name, reply)
+                raise_if_batch_pending(pending_count)
+
+            round_number += 1
+
+    timings = {"debate_seconds": time.perf_counter() - session_started}
+    winner = None
+    if len(active_models) == 1:
+        winner = next(iter(active_models))
 
-    transcript_text_for_judge = format_transcript(transcript)
+    speculation_executor = None
+    speculative_future = None
+    if (
+        SPECULATIVE_WRITER
+        and winner
+        and not batch_collection_active()
+        and get_checkpoint_stage(checkpoint, "writer") is None
+    ):
+        speculation_executor = ThreadPoolExecutor(max_workers=1)
+        speculative_future = speculation_executor.submit(
+            carry_trace_context(request_speculative_answer),
+            user_prompt, base_system, winner, debate_state[winner]["latest"]["content"]
+        )
 
     judge_history = [
         {"role": "system", "content": build_judge_system_prompt(base_system)},
-        {
-            "role": "user",
-            "content": build_judge_request(user_prompt, winner, transcript_text_for_judge, final_positions_text),
-        },
+        {"role": "user", "content": build_judge_input(user_prompt, winner, transcript, debate_state)},
     ]
     print(f"{Colors.MAGENTA}Judge reviewing debate...{Colors.RESET}")
-    judge_raw = generate_chat_response(judge_history, JUDGE_MODEL)
+    stage_started = time.perf_counter()
+    with trace_span("judge", "stage", model=JUDGE_MODEL):
+        judge_raw = get_checkpoint_stage(checkpoint, "judge")
+        if judge_raw is None:
+            judge_raw = generate_chat_response(
+                judge_history, build_role_overrides("judge", JUDGE_MODEL, session_started)
+            )
+            if not judge_raw:
+                if speculation_executor is not None:
+                    speculation_executor.shutdown(wait=False, cancel_futures=True)
+                raise StageFailedError("No reply for stage judge")
+            save_checkpoint_stage(checkpoint, "judge", judge_raw)
+    timings["judge_seconds"] = time.perf_counter() - stage_started
     judge_history.append({"role": "assistant", "content": judge_raw})
     judge_result = parse_judge_response(judge_raw)
     judge_payload = parse_json_response(judge_raw)
@@ -396,20 +691,52 @@ def run_debate_session(user_prompt, base_system):
         f"{Colors.MAGENTA}{JUDGE_LABEL} verdict ready ({judge_result.get('verdict', 'no_winner').upper()}){Colors.RESET}"
     )
 
+    winner_label = judge_result.get("winner")
+    canonical_winner = None
+    winner_statement = None
+    if isinstance(winner_label, str):
+        for label_key in debate_state:
+            if label_key.lower() == winner_label.lower():
+                canonical_winner = label_key
+                latest_entry = debate_state[label_key]["latest"]
+                winner_statement = latest_entry.get("content", "").strip()
+                break
+
     consensus_results = {}
     agree_count = 0
     disagree_count = 0
-    for participant in DEBATE_MODELS:
-        label = participant["label"]
-        state = debate_state[label]
-        consensus_prompt = build_consensus_prompt(judge_result["conclusion"], judge_result["reasoning"] or "")
-        state["history"].append({"role": "user", "content": consensus_prompt})
-        consensus = request_consensus_reply(state["history"], state["model"])
-        consensus_results[label] = consensus
-        if consensus["agreement"] == "agree":
-            agree_count += 1
-        else:
-            disagree_count += 1
+    inferred_count = 0
+    pending_count = 0
+    stage_started = time.perf_counter()
+    with trace_span("consensus", "stage"):
+        for participant in DEBATE_MODELS:
+            label = participant["label"]
+            state = debate_state[label]
+            consensus = infer_consensus_vote(label, state["latest"], debate_state, judge_result, canonical_winner)
+            if consensus is not None:
+                inferred_count += 1
+            else:
+                consensus_prompt = build_consensus_prompt(judge_result["conclusion"], judge_result["reasoning"] or "")
+                state["history"].append({"role": "user", "content": consensus_prompt})
+                try:
+                    consensus = request_checkpointed_reply(
+                        checkpoint,
+                        f"consensus:{label}",
+                        state["history"],
+                        build_role_overrides("consensus", state["model"], session_started),
+                        request_consensus_reply,
+                    )
+                except BatchRequestPending:
+                    pending_count += 1
+                    continue
+                record_word_overrun(state["model"], consensus["comment"], CONSENSUS_COMMENT_WORD_LIMIT)
+            consensus_results[label] = consensus
+            if consensus["agreement"] == "agree":
+                agree_count += 1
+            else:
+                disagree_count += 1
+        raise_if_batch_pending(pending_count)
+    timings["consensus_seconds"] = time.perf_counter() - stage_started
 
     verdict_lines = [f"{JUDGE_LABEL} Verdict ({judge_result['verdict']}):"]
     if judge_result.get("winner"):
@@ -422,10 +749,14 @@ def run_debate_session(user_prompt, base_system):
     verdict_text = "\n".join(verdict_lines).strip()
 
     vote_lines = [f"Agreement: {agree_count} | Disagreement: {disagree_count}"]
+    if inferred_count:
+        vote_lines[0] += f" | Inferred: {inferred_count}"
     if consensus_results:
         vote_lines.append("Consensus votes:")
         for name, entry in consensus_results.items():
             vote = entry["agreement"].capitalize()
+            if entry.get("inferred"):
+                vote += " [inferred]"
             comment = entry["comment"]
             if comment:
                 vote_lines.append(f"- {name}: {vote} ({comment})")
@@ -433,51 +764,43 @@ def run_debate_session(user_prompt, base_system):
                 vote_lines.append(f"- {name}: {vote}")
     votes_text = "\n".join(vote_lines).strip()
 
-    winner_label = judge_result.get("winner")
-    canonical_winner = None
-    winner_statement = None
-    if isinstance(winner_label, str):
-        for label_key in debate_state:
-            if label_key.lower() == winner_label.lower():
-                canonical_winner = label_key
-                latest_entry = debate_state[label_key]["latest"]
-                winner_statement = latest_entry.get("content", "").strip()
-                break
-
     verdict_summary = verdict_text
     judge_conclusion_text = judge_result.get("conclusion", "")
-    final_answer_history = [
-        {"role": "system", "content": build_final_answer_system_prompt(base_system)},
-        {
-            "role": "user",
-            "content": build_final_answer_request(
-                user_prompt,
-                verdict_summary,
-                judge_conclusion_text,
-                canonical_winner or (winner_label if isinstance(winner_label, str) else "None"),
-                winner_statement,
-            ),
-        },
-    ]
-    final_answer_raw = generate_chat_response(final_answer_history, WRITER_MODEL)
-    final_answer_history.append({"role": "assistant", "content": final_answer_raw})
-    final_answer_candidate = final_answer_raw.strip()
-    parsed_final_answer = parse_json_response(final_answer_candidate)
-    if not parsed_final_answer and final_answer_candidate.startswith("```"):
-        unfenced_candidate = strip_code_fences(final_answer_candidate).strip()
-        if unfenced_candidate:
-            parsed_final_answer = parse_json_response(unfenced_candidate)
-            if parsed_final_answer:
-                final_answer_candidate = unfenced_candidate
-    if parsed_final_answer:
-        for key in ("answer", "conclusion", "content", "final_answer"):
-            value = parsed_final_answer.get(key)
-            if isinstance(value, str) and value.strip():
-                final_answer_candidate = value.strip()
-                break
-    if not final_answer_candidate:
-        final_answer_candidate = judge_conclusion_text
-    final_answer_text = final_answer_candidate.strip()
+    stage_started = time.perf_counter()
+    final_answer_text = get_checkpoint_stage(checkpoint, "writer")
+    if speculative_future is not None:
+        final_answer_text = resolve_speculative_answer(speculative_future, judge_result, winner, canonical_winner)
+        speculation_executor.shutdown(wait=False)
+        if final_answer_text is not None:
+            save_checkpoint_stage(checkpoint, "writer", final_answer_text)
+    if final_answer_text is None:
+        final_answer_history = [
+            {"role": "system", "content": build_final_answer_system_prompt(base_system)},
+            {
+                "role": "user",
+                "content": build_final_answer_request(
+                    user_prompt,
+                    verdict_summary,
+                    judge_conclusion_text,
+                    canonical_winner or (winner_label if isinstance(winner_label, str) else "None"),
+                    winner_statement,
+                ),
+            },
+        ]
+        with trace_span("writer", "stage", model=WRITER_MODEL):
+            final_answer_raw = generate_chat_response(
+                final_answer_history, build_role_overrides("writer", WRITER_MODEL, session_started)
+            )
+        if not final_answer_raw:
+            raise StageFailedError("No reply for stage writer")
+        final_answer_history.append({"role": "assistant", "content": final_answer_raw})
+        final_answer_text = extract_final_answer_text(final_answer_raw, judge_conclusion_text)
+        save_checkpoint_stage(checkpoint, "writer", final_answer_text)
+
+    timings["writer_seconds"] = time.perf_counter() - stage_started
+    timings["total_seconds"] = time.perf_counter() - session_started
+    # Every stage above either replayed or saved a real reply, so the log is no longer needed.
+    finish_checkpoint(checkpoint)
 
     formatted_transcript = format_transcript_display(transcript)
     final_transcript_text = format_transcript(transcript)
@@ -491,4 +814,22 @@ def run_debate_session(user_prompt, base_system):
         "raw_transcript": final_transcript_text,
         "judge": judge_result,
         "consensus": consensus_results,
+        "rounds": round_number - 1,
+        "session_id": session_id,
+        "turns": transcript,
+        "timings": timings,
     }
+
+
+# This function picks an interrupted debate back up from its checkpoint log.
+def resume_debate_session(session_id, user_prompt=None, base_system=None):
+    """Resume the debate logged under session_id, skipping every stage already completed.
+
+    Passing user_prompt and base_system makes the resume fail unless the log was written for that prompt.
+    """
+    header = get_checkpoint_stage(open_checkpoint(session_id, CHECKPOINT_DIRECTORY), "session")
+    if header is None:
+        raise ValueError(f"No checkpoint found for session {session_id}")
+    if user_prompt is None:
+        user_prompt, base_system = header["user_prompt"], header["base_system"]
+    return run_debate_session(user_prompt, base_system, max_rounds=header.get("max_rounds"), session_id=session_id)
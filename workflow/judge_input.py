@@ -0,0 +1,191 @@
+# This file shrinks the debate transcript before the judge reads it.
+import difflib
+import re
+
+from config import DEBATE_MODELS
+
+
+PREVIEW_WORD_LIMIT = 12
+TRUNCATION_MARKER = " [truncated]"
+
+
+# This function guesses how many tokens a piece of text costs.
+def estimate_token_count(text):
+    """Approximate the token count of text (roughly four characters per token)."""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+# This function chops text into sentences so we can compare rounds.
+def split_sentences(text):
+    pieces = re.split(r"(?<=[.!?])\s+|\n+", (text or "").strip())
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+# This function shortens a sentence to a few words for reference.
+def preview_text(text, word_limit=PREVIEW_WORD_LIMIT):
+    words = text.split()
+    if len(words) <= word_limit:
+        return text
+    return " ".join(words[:word_limit]) + " …"
+
+
+# This function describes a stance the same way the transcript does.
+def describe_stance(entry):
+    stance = entry.get("stance", "stand")
+    conceded_to = entry.get("conceded_to")
+    if stance == "concede" and conceded_to:
+        return f"concede → {conceded_to}"
+    return stance
+
+
+# This function lists what a debater changed since their last turn.
+def build_turn_delta(previous, current):
+    """Describe the stance transition and sentence-level edits between two turns."""
+    lines = []
+    previous_stance = describe_stance(previous)
+    current_stance = describe_stance(current)
+    if previous_stance != current_stance:
+        lines.append(f"Stance: {previous_stance} → {current_stance}")
+    else:
+        lines.append(f"Stance: {current_stance} (unchanged)")
+
+    previous_sentences = split_sentences(previous.get("content", ""))
+    current_sentences = split_sentences(current.get("content", ""))
+    matcher = difflib.SequenceMatcher(a=previous_sentences, b=current_sentences, autojunk=False)
+    content_changed = False
+    for tag, start_a, end_a, start_b, end_b in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        content_changed = True
+        if tag == "replace":
+            replaced = " ".join(previous_sentences[start_a:end_a])
+            lines.append(f"~ {' '.join(current_sentences[start_b:end_b])} (replaces: {preview_text(replaced)})")
+        elif tag == "insert":
+            for sentence in current_sentences[start_b:end_b]:
+                lines.append(f"+ {sentence}")
+        elif tag == "delete":
+            for sentence in previous_sentences[start_a:end_a]:
+                lines.append(f"- {preview_text(sentence)}")
+    if not content_changed:
+        lines.append("Content unchanged.")
+
+    previous_notes = (previous.get("notes") or "").strip()
+    current_notes = (current.get("notes") or "").strip()
+    if current_notes and current_notes != previous_notes:
+        lines.append(f"Notes: {current_notes}")
+    return "\n".join(lines)
+
+
+# This function writes out a round 1 answer in full.
+def format_full_turn(entry):
+    header = f"Round {entry['round']} — {entry['model']} ({describe_stance(entry)})"
+    lines = [header, entry.get("content", "").strip()]
+    notes = (entry.get("notes") or "").strip()
+    if notes:
+        lines.append(f"Notes: {notes}")
+    return "\n".join(lines)
+
+
+# This function turns the transcript into prioritized judge sections.
+def build_judge_sections(transcript):
+    """Return judge input sections as dicts with text, priority, and round keys.
+
+    Priority 0 holds the full round 1 answers, priority 1 holds each debater's
+    final delta, and priority 2 holds intermediate deltas (dropped first).
+    """
+    debater_labels = {participant["label"] for participant in DEBATE_MODELS}
+    latest_by_model = {}
+    last_round_by_model = {}
+    for entry in transcript:
+        if entry.get("model") in debater_labels and isinstance(entry.get("round"), int):
+            last_round_by_model[entry["model"]] = entry["round"]
+
+    sections = []
+    for entry in transcript:
+        label = entry.get("model")
+        round_number = entry.get("round")
+        if label not in debater_labels or not isinstance(round_number, int):
+            continue
+        previous = latest_by_model.get(label)
+        if previous is None:
+            sections.append({"text": format_full_turn(entry), "priority": 0, "round": round_number})
+        else:
+            header = f"Round {round_number} — {label} changes"
+            text = f"{header}\n{build_turn_delta(previous, entry)}"
+            priority = 1 if last_round_by_model.get(label) == round_number else 2
+            sections.append({"text": text, "priority": priority, "round": round_number})
+        latest_by_model[label] = entry
+    return sections
+
+
+# This function cuts a section down to fit a token allowance.
+def truncate_to_tokens(text, token_limit):
+    if estimate_token_count(text) <= token_limit:
+        return text
+    character_limit = max(token_limit * 4 - len(TRUNCATION_MARKER), 0)
+    return text[:character_limit].rstrip() + TRUNCATION_MARKER
+
+
+# This function keeps the most important sections within the token budget.
+def fit_sections_to_budget(sections, token_budget):
+    """Drop and trim low-priority sections until the joined text fits token_budget."""
+    kept = list(sections)
+
+    def total_tokens(items):
+        return estimate_token_count("\n\n".join(item["text"] for item in items))
+
+    if token_budget is None or total_tokens(kept) <= token_budget:
+        return kept
+
+    omitted_rounds = set()
+    droppable = sorted(
+        (section for section in kept if section["priority"] >= 2),
+        key=lambda section: (-section["priority"], section["round"]),
+    )
+    for section in droppable:
+        if total_tokens(kept) <= token_budget:
+            break
+        kept.remove(section)
+        omitted_rounds.add(section["round"])
+
+    if omitted_rounds:
+        rounds_text = ", ".join(str(number) for number in sorted(omitted_rounds))
+        marker_index = next(
+            (index for index, section in enumerate(kept) if section["round"] > min(omitted_rounds)),
+            len(kept),
+        )
+        kept.insert(
+            marker_index,
+            {
+                "text": f"[Intermediate changes from round(s) {rounds_text} omitted to fit the judge budget]",
+                "priority": 0,
+                "round": 0,
+            },
+        )
+
+    for priority in (1, 0):
+        overflow = total_tokens(kept) - token_budget
+        if overflow <= 0:
+            break
+        targets = [section for section in kept if section["priority"] == priority and section["round"]]
+        if not targets:
+            continue
+        share = max(overflow // len(targets) + 1, 1)
+        for section in targets:
+            allowance = max(estimate_token_count(section["text"]) - share, 16)
+            section["text"] = truncate_to_tokens(section["text"], allowance)
+
+    return kept
+
+
+# This function builds the compact transcript the judge receives.
+def build_judge_transcript(transcript, token_budget=None):
+    """Return round 1 in full plus per-debater deltas for later rounds, capped at token_budget."""
+    sections = [dict(section) for section in build_judge_sections(transcript)]
+    kept = fit_sections_to_budget(sections, token_budget)
+    transcript_text = "\n\n".join(section["text"] for section in kept).strip()
+    if token_budget is not None:
+        transcript_text = truncate_to_tokens(transcript_text, token_budget)
+    return transcript_text
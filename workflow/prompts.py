@@ -1,7 +1,13 @@
 # This file holds the text templates we send to the models.
 from textwrap import dedent
 
-from config import JUDGE_LABEL, WRITER_LABEL
+from config import (
+    CONSENSUS_COMMENT_WORD_LIMIT,
+    DEBATER_INITIAL_WORD_LIMIT,
+    DEBATER_UPDATE_WORD_LIMIT,
+    JUDGE_LABEL,
+    WRITER_LABEL,
+)
 
 
 # This function writes the pep talk each debater gets.
@@ -26,7 +32,7 @@ def build_initial_debate_message(user_prompt):
         • Consider the user submission below and provide your best initial answer.
         • You must respond with JSON using the keys "stance", "content", and optional "notes".
         • For Round 1 set "stance" to "stand". Reserve concessions for later rounds.
-        • Keep "content" concise (<= 250 words) and directly address the submission.
+        • Keep "content" concise (<= {DEBATER_INITIAL_WORD_LIMIT} words) and directly address the submission.
 
         User submission:
         {user_prompt.strip()}
@@ -44,7 +50,7 @@ def build_round_update_message(round_number, state_summary):
         • Parse the JSON to understand each participant's stance, key points, and concessions.
         • You may reinforce your stance or concede if another model's case is stronger.
         • To concede, set "stance" to "concede:<Model Name>" referencing the model you believe should win.
-        • If you remain in the debate, keep "stance" as "stand" and refine your argument (<= 200 words).
+        • If you remain in the debate, keep "stance" as "stand" and refine your argument (<= {DEBATER_UPDATE_WORD_LIMIT} words).
         • Always respond with JSON keys "stance", "content", and optional "notes".
         """
     ).strip()
@@ -58,7 +64,7 @@ def build_consensus_prompt(judge_conclusion, judge_reasoning):
         Conclusion: {judge_conclusion}
         Reasoning: {judge_reasoning}
 
-        Reply with JSON using keys "agreement" ("agree" or "disagree") and optional "comment" (<= 40 words).
+        Reply with JSON using keys "agreement" ("agree" or "disagree") and optional "comment" (<= {CONSENSUS_COMMENT_WORD_LIMIT} words).
         """
     ).strip()
 
@@ -107,6 +113,34 @@ def build_judge_request(user_prompt, winner, transcript_text, final_positions):
     ).strip()
 
 
+# This function lays out the judge request when only round changes are sent.
+def build_judge_delta_request(user_prompt, winner, delta_transcript):
+    winner_text = winner if winner else "None"
+    return dedent(
+        f"""
+        Review the following debate and deliver the final verdict.
+
+        User submission:
+        {user_prompt.strip()}
+
+        Debate transcript (round 1 in full, later rounds as changes only):
+        {delta_transcript}
+
+        Reading the changes: "Stance" shows each model's stance transition, "+" marks added sentences,
+        "-" marks removed sentences, and "~" marks rewritten sentences. A model's latest position is its
+        round 1 answer with every later change applied.
+
+        Apparent winner after the debate rounds: {winner_text}
+
+        Respond in JSON with keys:
+        - "verdict": "approved" (winner confirmed), "rejected" (winner incorrect, provide correction), or "no_winner" (you produce the answer).
+        - "conclusion": Your final answer for the user.
+        - "reasoning": Brief fact-checking summary (<= 120 words).
+        - "winner": Name of the winning model you validated or corrected (null if none).
+        """
+    ).strip()
+
+
 # This function frames the judge's final speaking role.
 def build_final_answer_system_prompt(base_system):
     instructions = dedent(
@@ -158,3 +192,37 @@ def build_final_answer_request(user_prompt, verdict_summary, judge_conclusion, w
         • Keep the response coherent and, if useful, formatted in Markdown.
         """
     ).strip()
+
+
+# This function asks the writer for an early draft based on the leading debater.
+def build_speculative_answer_request(user_prompt, winner_label, winner_statement):
+    return dedent(
+        f"""
+        Craft the final answer for the user.
+
+        User prompt:
+        {user_prompt.strip()}
+
+        Leading model ({winner_label}) statement:
+        {winner_statement.strip()}
+
+        Requirements:
+        • Deliver only the direct answer the user needs, grounded in the statement above.
+        • Exclude debate logistics, model names, or vote tallies.
+        • Keep the response coherent and, if useful, formatted in Markdown.
+        """
+    ).strip()
+
+
+# This function sets up the single model that answers easy prompts on its own.
+def build_fast_answer_system_prompt(base_system):
+    instructions = dedent(
+        """
+        You are a precise assistant answering the user directly.
+        Give one clear, correct answer and keep it brief unless the question needs detail.
+        Respond in plain Markdown without surrounding JSON or metadata.
+        """
+    ).strip()
+    if base_system:
+        instructions = f"{instructions}\n\nOperator context to honor:\n{base_system.strip()}"
+    return instructions
@@ -0,0 +1,264 @@
+# This file decides how much debate a prompt needs before running it.
+import json
+import os
+import re
+import threading
+import time
+
+from config import (
+    ANALYTICS_EXPORT_ENABLED,
+    CHECKPOINT_DIRECTORY,
+    ROUTER_EASY_MAX_SCORE,
+    ROUTER_ENABLED,
+    ROUTER_FAST_MODEL,
+    ROUTER_HARD_MIN_SCORE,
+    ROUTER_MEDIUM_ROUNDS,
+    ROUTER_MEMORY_LIMIT,
+    ROUTER_MEMORY_PATH,
+    ROUTER_SIMILARITY_THRESHOLD,
+)
+from services.openai_client import Colors, generate_chat_response
+from storage.analytics import export_debate_result
+from storage.checkpoints import checkpoint_exists
+from workflow.budgets import build_role_overrides
+from workflow.debate import (
+    StageFailedError,
+    format_transcript,
+    format_transcript_display,
+    resume_debate_session,
+    run_debate_session,
+)
+from workflow.prompts import build_fast_answer_system_prompt
+
+
+TIERS = ("easy", "medium", "hard")
+
+HARD_MARKERS = re.compile(
+    r"\b(compare|contrast|analy[sz]e|trade-?offs?|pros and cons|design|architect\w*|prove|derive|evaluate|"
+    r"critique|recommend\w*|strateg\w*|should (?:i|we)|implications?)\b",
+    re.IGNORECASE,
+)
+# "how many"/"how much" are factual lookups (see EASY_MARKERS), not requests for an explanation.
+EXPLANATION_MARKERS = re.compile(r"\b(why|how(?!\s+(?:many|much)\b)|explain)\b", re.IGNORECASE)
+EASY_MARKERS = re.compile(
+    r"^\s*(what is|what's|who is|who was|when (?:is|was|did)|where is|define|how (?:many|much)|translate|spell)\b",
+    re.IGNORECASE,
+)
+ARITHMETIC_PATTERN = re.compile(r"^[\s\d+\-*/^().,=?x%]+$|^\s*what(?: is|'s)\s+[\d\s+\-*/^().x%]+\??\s*$", re.IGNORECASE)
+
+TIER_LOCK = threading.Lock()
+TIER_STATS = {tier: {"count": 0, "total_seconds": 0.0} for tier in TIERS}
+MEMORY_LOCK = threading.Lock()
+
+
+# This function breaks a prompt into lowercase words for comparison.
+def tokenize_prompt(prompt):
+    return set(re.findall(r"[a-z0-9]+", prompt.lower()))
+
+
+# This function loads prompts that previous debates settled right away.
+def load_converged_prompts(file_path=ROUTER_MEMORY_PATH):
+    if not os.path.isfile(file_path):
+        return []
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            prompts = json.load(f)
+    except (IOError, json.JSONDecodeError) as e:
+        print(f"Error reading {file_path}: {e}")
+        return []
+    return prompts if isinstance(prompts, list) else []
+
+
+# This function remembers a prompt whose debate converged immediately.
+def remember_converged_prompt(prompt, file_path=ROUTER_MEMORY_PATH, limit=ROUTER_MEMORY_LIMIT):
+    with MEMORY_LOCK:
+        prompts = [entry for entry in load_converged_prompts(file_path) if entry != prompt]
+        prompts.append(prompt)
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(prompts[-limit:], f, ensure_ascii=False, indent=2)
+        except IOError as e:
+            print(f"Error saving {file_path}: {e}")
+
+
+# This function finds how close a prompt is to ones that converged before.
+def max_converged_similarity(prompt, converged_prompts):
+    tokens = tokenize_prompt(prompt)
+    best = 0.0
+    if not tokens:
+        return best
+    for previous in converged_prompts:
+        previous_tokens = tokenize_prompt(previous)
+        if not previous_tokens:
+            continue
+        similarity = len(tokens & previous_tokens) / len(tokens | previous_tokens)
+        best = max(best, similarity)
+    return best
+
+
+# This function scores a prompt's difficulty and picks a tier.
+def classify_prompt_tier(prompt, converged_prompts=None):
+    """Return (tier, score, reasons) for prompt using cheap local heuristics."""
+    if converged_prompts is None:
+        converged_prompts = load_converged_prompts()
+    text = prompt.strip()
+    word_count = len(text.split())
+    score = 0
+    reasons = []
+
+    if word_count > 25:
+        score += 1
+        reasons.append(f"{word_count} words")
+    if word_count > 80:
+        score += 1
+    if word_count > 250:
+        score += 1
+
+    hard_matches = {match.lower() for match in HARD_MARKERS.findall(text)}
+    if hard_matches:
+        score += 2 if len(hard_matches) == 1 else 3
+        reasons.append("analysis terms: " + ", ".join(sorted(hard_matches)))
+    elif EXPLANATION_MARKERS.search(text):
+        score += 1
+        reasons.append("asks for an explanation")
+
+    if "```" in text or text.count("\n") >= 3:
+        score += 1
+        reasons.append("multi-line or code input")
+    if text.count("?") > 1:
+        score += 1
+        reasons.append("several questions")
+
+    if ARITHMETIC_PATTERN.match(text) or (EASY_MARKERS.match(text) and word_count <= 12):
+        score -= 1
+        reasons.append("short factual question")
+
+    similarity = max_converged_similarity(text, converged_prompts)
+    if similarity >= ROUTER_SIMILARITY_THRESHOLD:
+        score -= 2
+        reasons.append(f"similar to a prompt that converged immediately ({similarity:.2f})")
+
+    if score <= ROUTER_EASY_MAX_SCORE:
+        tier = "easy"
+    elif score >= ROUTER_HARD_MIN_SCORE:
+        tier = "hard"
+    else:
+        tier = "medium"
+    return tier, score, reasons
+
+
+# This function answers an easy prompt with one model and no debate.
+def run_fast_answer_session(user_prompt, base_system):
+    """Answer with ROUTER_FAST_MODEL alone, returning the same shape as run_debate_session.
+
+    Raises StageFailedError when the model gives no answer.
+    """
+    history = [
+        {"role": "system", "content": build_fast_answer_system_prompt(base_system)},
+        {"role": "user", "content": user_prompt.strip()},
+    ]
+    started = time.perf_counter()
+    answer = generate_chat_response(history, build_role_overrides("writer", ROUTER_FAST_MODEL)).strip()
+    elapsed = time.perf_counter() - started
+    if not answer:
+        # An empty reply means the call failed; raise like the debate stages so the job can be retried.
+        raise StageFailedError("No reply for stage fast path")
+    transcript = [
+        {
+            "round": "Fast Path",
+            "model": ROUTER_FAST_MODEL,
+            "stance": "",
+            "content": answer,
+            "notes": "",
+            "conceded_to": None,
+        }
+    ]
+    return {
+        "verdict": f"Fast path: answered directly by {ROUTER_FAST_MODEL} without a debate.",
+        "votes": "",
+        "final_answer": answer,
+        "winner": None,
+        "transcript": format_transcript_display(transcript),
+        "raw_transcript": format_transcript(transcript),
+        "judge": {},
+        "consensus": {},
+        "rounds": 0,
+        "session_id": None,
+        "turns": transcript,
+        "timings": {"writer_seconds": elapsed, "total_seconds": elapsed},
+    }
+
+
+# This function decides if a finished debate settled straight away.
+def debate_converged_immediately(result):
+    judge = result.get("judge") or {}
+    consensus = result.get("consensus") or {}
+    return (
+        bool(result.get("winner"))
+        and result.get("rounds", 0) <= 2
+        and str(judge.get("verdict", "")).lower() == "approved"
+        and all(vote.get("agreement") == "agree" for vote in consensus.values())
+    )
+
+
+# This function routes a prompt to the right tier and runs it.
+def run_routed_session(user_prompt, base_system, session_id=None):
+    """Pick a tier for user_prompt, run it, and record tier latency.
+
+    A session_id with an unfinished checkpoint log for the same prompt resumes that debate instead of
+    routing again; a log written for a different prompt raises ValueError.
+    With ANALYTICS_EXPORT_ENABLED the finished session is also written to the Parquet export.
+    """
+    if session_id and checkpoint_exists(session_id, CHECKPOINT_DIRECTORY):
+        result = resume_debate_session(session_id, user_prompt, base_system)
+    elif not ROUTER_ENABLED:
+        result = run_debate_session(user_prompt, base_system, session_id=session_id)
+    else:
+        result = run_tiered_session(user_prompt, base_system, session_id)
+    if ANALYTICS_EXPORT_ENABLED:
+        export_debate_result(result)
+    return result
+
+
+# This function classifies a prompt and runs it at the matching tier.
+def run_tiered_session(user_prompt, base_system, session_id):
+    tier, score, reasons = classify_prompt_tier(user_prompt)
+    reason_text = "; ".join(reasons) if reasons else "no difficulty signals"
+    print(f"{Colors.BLUE}Routing to {tier.upper()} tier (score {score}: {reason_text}){Colors.RESET}")
+
+    started = time.perf_counter()
+    if tier == "easy":
+        result = run_fast_answer_session(user_prompt, base_system)
+    elif tier == "medium":
+        result = run_debate_session(
+            user_prompt, base_system, max_rounds=ROUTER_MEDIUM_ROUNDS, session_id=session_id
+        )
+    else:
+        result = run_debate_session(user_prompt, base_system, session_id=session_id)
+    elapsed = time.perf_counter() - started
+
+    with TIER_LOCK:
+        TIER_STATS[tier]["count"] += 1
+        TIER_STATS[tier]["total_seconds"] += elapsed
+
+    if tier != "easy" and debate_converged_immediately(result):
+        remember_converged_prompt(user_prompt)
+
+    result["tier"] = tier
+    return result
+
+
+# This function reports how prompts were spread across tiers and how long each took.
+def format_tier_report():
+    with TIER_LOCK:
+        stats = {tier: dict(values) for tier, values in TIER_STATS.items()}
+    total = sum(values["count"] for values in stats.values())
+    if not total:
+        return "Router tiers: no prompts routed yet"
+    lines = [f"Router tiers ({total} prompts):"]
+    for tier in TIERS:
+        count = stats[tier]["count"]
+        share = count / total * 100
+        average = stats[tier]["total_seconds"] / count if count else 0.0
+        lines.append(f"- {tier}: {count} ({share:.0f}%), avg {average:.1f}s")
+    return "\n".join(lines)